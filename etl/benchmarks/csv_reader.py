@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark:  pandas type inference vs schema-typed pyarrow CSV reader
+Author:  Ankit
+Date: 2026-10-19
+
+    python benchmarks/csv_reader.py --rows 500000
+    python benchmarks/csv_reader.py --path sample_data/students.csv --table student
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from schema_types import read_csv
+from transform import DataTransformer
+
+
+def write_students(path, rows, seed=42):
+    """Synthetic student CSV; digit-only phones and a few blanks to trip type inference"""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(rows)
+    phone = rng.integers(2_000_000_000, 9_999_999_999, rows).astype(str).astype(object)
+    phone[rng.random(rows) < 0.05] = ''
+    pd.DataFrame({
+        'first_name': 'First' + pd.Series(ids % 5000).astype(str),
+        'last_name': 'Last' + pd.Series(ids % 7000).astype(str),
+        'email': 'student' + pd.Series(ids).astype(str) + '@student.edu',
+        'phone': phone,
+        'date_of_birth': (pd.Timestamp('1995-01-01')
+                          + pd.to_timedelta(rng.integers(0, 3650, rows), unit='D')).strftime('%Y-%m-%d'),
+        'enrollment_year': rng.integers(2015, 2025, rows),
+        'department_id': rng.integers(1, 10, rows),
+        'status': rng.choice(['Active', 'Inactive', 'Graduated'], rows),
+    }).to_csv(path, index=False)
+
+
+def best_of(repeat, fn):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare CSV reader engines')
+    parser.add_argument('--path', help='Existing CSV to read (default: generate students)')
+    parser.add_argument('--table', help='Table the CSV holds (default: matched from the header)')
+    parser.add_argument('--rows', type=int, default=200_000, help='Rows to generate')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per engine (best is reported)')
+    parser.add_argument('--transform', action='store_true',
+                        help='Also time transform_students on the result (student CSVs only)')
+    args = parser.parse_args()
+
+    path = args.path
+    if not path:
+        path = os.path.join(tempfile.mkdtemp(), 'students.csv')
+        write_students(path, args.rows)
+        print(f"Generated {args.rows} rows: {path}")
+
+    engines = {
+        'pandas (inferred)': lambda: pd.read_csv(path),
+        'pyarrow (schema-typed)': lambda: read_csv(path, args.table),
+    }
+
+    Config.CSV_ENGINE = 'pyarrow'
+    for name, read in engines.items():
+        seconds, df = best_of(args.repeat, read)
+        print(f"\n{name}: read {len(df)} rows in {seconds:.3f}s ({len(df) / seconds:,.0f} rows/s)")
+        for column in ['phone', 'date_of_birth', 'enrollment_year']:
+            if column in df:
+                sample = df[column].dropna()
+                kind = type(sample.iloc[0]).__name__ if len(sample) else '-'
+                print(f"  {column:<16} dtype={str(df[column].dtype):<8} values={kind}")
+
+        if args.transform:
+            transformer = DataTransformer()
+            seconds, _ = best_of(1, lambda: transformer.transform_students(df))
+            print(f"  transform_students: {seconds:.3f}s "
+                  f"(valid {transformer.stats['valid_records']}, invalid {transformer.stats['invalid_records']})")
+
+
+if __name__ == '__main__':
+    main()
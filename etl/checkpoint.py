@@ -0,0 +1,167 @@
+import uuid
+from datetime import datetime
+from utils.logger import setup_logger
+
+logger = setup_logger('Checkpoint')
+
+
+class CheckpointStore:
+    """Durable run and per-table load progress, stored next to the data it describes"""
+
+    DDL = """
+    CREATE TABLE IF NOT EXISTS etl_run (
+        run_id VARCHAR(40) PRIMARY KEY,
+        source_type VARCHAR(20),
+        source_path TEXT,
+        -- Files source_path resolved to; a resume must see the same list
+        source_files TEXT[],
+        status VARCHAR(20) NOT NULL DEFAULT 'running' CHECK (
+            status IN ('running', 'failed', 'completed')
+        ),
+        started_at TIMESTAMP DEFAULT NOW(),
+        finished_at TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS etl_checkpoint (
+        run_id VARCHAR(40) NOT NULL REFERENCES etl_run (run_id) ON DELETE CASCADE,
+        table_name VARCHAR(50) NOT NULL,
+        -- File or sheet the rows come from; '' is the table as a whole
+        dataset TEXT NOT NULL DEFAULT '',
+        rows_committed INTEGER NOT NULL DEFAULT 0,
+        batches_committed INTEGER NOT NULL DEFAULT 0,
+        completed BOOLEAN NOT NULL DEFAULT FALSE,
+        updated_at TIMESTAMP DEFAULT NOW(),
+        PRIMARY KEY (run_id, table_name, dataset)
+    );
+
+    -- Control tables created before per-file progress was tracked
+    ALTER TABLE etl_run ADD COLUMN IF NOT EXISTS source_files TEXT[];
+
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_attribute
+                       WHERE attrelid = 'etl_checkpoint'::regclass AND attname = 'dataset') THEN
+            ALTER TABLE etl_checkpoint ADD COLUMN dataset TEXT NOT NULL DEFAULT '';
+            ALTER TABLE etl_checkpoint DROP CONSTRAINT etl_checkpoint_pkey;
+            ALTER TABLE etl_checkpoint ADD PRIMARY KEY (run_id, table_name, dataset);
+        END IF;
+    END $$;
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.run_id = None
+        self.source_files = None
+        # (table, dataset) -> progress
+        self.progress = {}
+
+    def ensure_tables(self):
+        """Create the control tables if they do not exist yet"""
+        self.cursor.execute(self.DDL)
+        self.conn.commit()
+
+    def start_run(self, source_type, source_path, source_files=None):
+        """Register a new run and return its id"""
+        self.run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self.cursor.execute(
+            "INSERT INTO etl_run (run_id, source_type, source_path, source_files) VALUES (%s, %s, %s, %s)",
+            (self.run_id, source_type, source_path, source_files)
+        )
+        self.conn.commit()
+        self.source_files = source_files
+        self.progress = {}
+        logger.info(f"Started run {self.run_id}")
+        return self.run_id
+
+    def resume_run(self, run_id):
+        """Load progress of an earlier run; returns its source_type and source_path
+
+        The files the run resolved its source to are kept in source_files.
+        """
+        self.cursor.execute(
+            "SELECT source_type, source_path, source_files, status FROM etl_run WHERE run_id = %s",
+            (run_id,)
+        )
+        row = self.cursor.fetchone()
+        if row is None:
+            raise ValueError(f"Unknown run id: {run_id}")
+        source_type, source_path, self.source_files, status = row
+        if status == 'completed':
+            raise ValueError(f"Run {run_id} already completed")
+
+        self.cursor.execute(
+            """
+            SELECT table_name, dataset, rows_committed, batches_committed, completed
+            FROM etl_checkpoint WHERE run_id = %s
+            """,
+            (run_id,)
+        )
+        self.progress = {
+            (table, dataset): {'rows_committed': rows, 'batches_committed': batches, 'completed': completed}
+            for table, dataset, rows, batches, completed in self.cursor.fetchall()
+        }
+
+        self.cursor.execute(
+            "UPDATE etl_run SET status = 'running', finished_at = NULL WHERE run_id = %s",
+            (run_id,)
+        )
+        self.conn.commit()
+        self.run_id = run_id
+
+        for (table, dataset), p in sorted(self.progress.items()):
+            state = 'completed' if p['completed'] else f"{p['rows_committed']} rows committed"
+            logger.info(f"Resuming run {run_id}: {table} {dataset or '(table)'} {state}")
+        return source_type, source_path
+
+    def offset(self, table, dataset=''):
+        """Number of cleaned rows of a table's dataset already committed in this run"""
+        return self.progress.get((table, dataset), {}).get('rows_committed', 0)
+
+    def is_complete(self, table, dataset=''):
+        """Whether a dataset of a table (by default the whole table) is fully loaded"""
+        return self.progress.get((table, dataset), {}).get('completed', False)
+
+    def advance(self, table, rows_committed, dataset=''):
+        """Record batch progress; runs inside the caller's transaction, commit with the batch"""
+        self.cursor.execute(
+            """
+            INSERT INTO etl_checkpoint (run_id, table_name, dataset, rows_committed, batches_committed)
+            VALUES (%s, %s, %s, %s, 1)
+            ON CONFLICT (run_id, table_name, dataset) DO UPDATE SET
+                rows_committed = EXCLUDED.rows_committed,
+                batches_committed = etl_checkpoint.batches_committed + 1,
+                updated_at = NOW()
+            """,
+            (self.run_id, table, dataset, rows_committed)
+        )
+        p = self.progress.setdefault(
+            (table, dataset), {'rows_committed': 0, 'batches_committed': 0, 'completed': False})
+        p['rows_committed'] = rows_committed
+        p['batches_committed'] += 1
+
+    def complete_table(self, table, dataset=''):
+        """Mark a dataset of a table (by default the whole table) as fully loaded
+
+        Runs inside the caller's transaction.
+        """
+        self.cursor.execute(
+            """
+            INSERT INTO etl_checkpoint (run_id, table_name, dataset, completed)
+            VALUES (%s, %s, %s, TRUE)
+            ON CONFLICT (run_id, table_name, dataset) DO UPDATE SET
+                completed = TRUE,
+                updated_at = NOW()
+            """,
+            (self.run_id, table, dataset)
+        )
+        self.progress.setdefault(
+            (table, dataset), {'rows_committed': 0, 'batches_committed': 0, 'completed': False})['completed'] = True
+
+    def finish_run(self, status):
+        """Close the run as completed or failed"""
+        self.cursor.execute(
+            "UPDATE etl_run SET status = %s, finished_at = NOW() WHERE run_id = %s",
+            (status, self.run_id)
+        )
+        self.conn.commit()
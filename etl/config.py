@@ -28,14 +28,36 @@ class Config:
     LOG_LEVEL = os. getenv('LOG_LEVEL', 'INFO')
     ENABLE_INCREMENTAL = os.getenv(
         'ENABLE_INCREMENTAL', 'false').lower() == 'true'
+    # Worker processes for multi-file extraction (defaults to core count)
+    MAX_WORKERS = int(os.getenv('MAX_WORKERS', os.cpu_count() or 1))
+
+    # CSV reader: 'pyarrow' (schema-typed, multithreaded) or 'pandas' (type inference)
+    CSV_ENGINE = os.getenv('CSV_ENGINE', 'pyarrow').lower()
+    # Table definitions the pyarrow engine takes column types from
+    SCHEMA_FILE = os.getenv('SCHEMA_FILE', os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'Task3', 'schema.sql'))
+
+    # Job queue (worker.py): lease length, idle poll interval, retries per job
+    JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', 300))
+    JOB_POLL_INTERVAL = int(os.getenv('JOB_POLL_INTERVAL', 5))
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
 
     # Directories
     LOG_DIR = 'logs'
     REPORT_DIR = 'reports'
+    REJECTS_DIR = 'rejects'
 
     # Data Source Types
     SOURCE_TYPES = ['google_sheets', 'csv', 'json', 'excel']
 
+    # File extension -> reader, used when --path is a directory or glob
+    FILE_EXTENSIONS = {
+        '.csv': 'csv',
+        '.json': 'json',
+        '.xlsx': 'excel',
+        '.xls': 'excel',
+    }
+
     @classmethod
     def validate(cls):
         """Validate required configuration"""
@@ -49,5 +71,6 @@ class Config:
         # Create directories
         os.makedirs(cls.LOG_DIR, exist_ok=True)
         os.makedirs(cls.REPORT_DIR, exist_ok=True)
+        os.makedirs(cls.REJECTS_DIR, exist_ok=True)
 
         return True
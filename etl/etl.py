@@ -5,9 +5,11 @@ Author:  Ankit
 Date: 2025-12-16
 """
 
+import os
 import sys
 import argparse
 import json
+import pandas as pd
 from datetime import datetime
 from config import Config
 
@@ -16,8 +18,11 @@ Config.validate()
 
 from extract import DataExtractor
 from transform import DataTransformer
-from load import DataLoader
+from load import DataLoader, LoadAborted
+from checkpoint import CheckpointStore
+from forecast import DemandForecaster
 from utils.logger import setup_logger
+from utils.rejects import RejectsWriter, read_rejects
 
 logger = setup_logger('ETL-Main')
 
@@ -25,22 +30,58 @@ logger = setup_logger('ETL-Main')
 class ETLPipeline:
     """Main ETL Pipeline Orchestrator"""
 
-    def __init__(self, source_type, source_path=None, spreadsheet_id=None, credentials_file=None, explicit_table=None):
+    # Table -> DataLoader method
+    LOADERS = {
+        'department': 'load_departments',
+        'student': 'load_students',
+        'course': 'load_courses',
+        'schedule': 'load_schedules',
+        'enrollment': 'load_enrollments',
+    }
+
+    # Tables in foreign key order
+    LOAD_ORDER = ['department', 'instructor', 'student', 'course',
+                  'classroom', 'schedule', 'enrollment']
+
+    # Table -> DataTransformer method
+    TRANSFORMERS = {
+        'department': 'transform_departments',
+        'student': 'transform_students',
+        'course': 'transform_courses',
+        'schedule': 'transform_schedules',
+        'enrollment': 'transform_enrollments',
+    }
+
+    def __init__(self, source_type, source_path=None, spreadsheet_id=None, credentials_file=None, explicit_table=None,
+                 replay_file=None, resume_run_id=None, on_run_start=None, lease=None):
         self.source_type = source_type
         self.source_path = source_path
         self.spreadsheet_id = spreadsheet_id or Config.SPREADSHEET_ID
         self.credentials_file = credentials_file or Config.GOOGLE_CREDENTIALS_FILE
         self.explicit_table = explicit_table  # NEW
+        self.replay_file = replay_file
+        self.resume_run_id = resume_run_id
+        # Called with the run id once the run is registered (used by worker.py)
+        self.on_run_start = on_run_start
+
+        # Rejected rows are streamed here instead of being kept in memory; microseconds
+        # and the pid keep runs started in the same second (e.g. by workers) apart
+        self.rejects = RejectsWriter(
+            f"{Config.REJECTS_DIR}/rejects_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{os.getpid()}.jsonl")
 
         self.extractor = None
-        self.transformer = DataTransformer()
+        self.transformer = DataTransformer(rejects=self.rejects)
         self.loader = DataLoader(Config.DB_CONFIG)
+        self.loader.lease = lease
+        self.checkpoints = None
+        self.run_id = None
+        self.error = None
 
         self.start_time = None
         self.end_time = None
 
-    def run(self, tables=None):
-        """Run the complete ETL pipeline"""
+    def run(self, tables=None, forecast=False):
+        """Run the complete ETL pipeline, optionally followed by demand forecasting"""
         try:
             self.start_time = datetime.now()
             logger.info("=" * 80)
@@ -51,20 +92,38 @@ class ETLPipeline:
             # Validate configuration
             Config.validate()
 
-            # EXTRACT
-            logger.info("\n[STEP 1/3] EXTRACTING DATA")
-            logger.info("-" * 80)
-            extracted_data = self.extract_data()
-
-            # TRANSFORM
-            logger.info("\n[STEP 2/3] TRANSFORMING DATA")
-            logger.info("-" * 80)
-            transformed_data = self.transform_data(extracted_data, tables)
-
-            # LOAD
-            logger.info("\n[STEP 3/3] LOADING DATA")
-            logger. info("-" * 80)
-            self.load_data(transformed_data)
+            # Register (or resume) the run before doing any work
+            self.loader.connect()
+            self.start_checkpoint()
+            if self.on_run_start:
+                self.on_run_start(self.run_id)
+
+            if self.can_stream_excel():
+                # EXTRACT + TRANSFORM + LOAD, one BATCH_SIZE chunk at a time
+                logger.info("\n[STEP 1-3/3] STREAMING EXCEL DATA")
+                logger.info("-" * 80)
+                self.stream_excel(tables)
+            else:
+                # EXTRACT
+                logger.info("\n[STEP 1/3] EXTRACTING DATA")
+                logger.info("-" * 80)
+                extracted_data = self.extract_data()
+
+                # TRANSFORM
+                logger.info("\n[STEP 2/3] TRANSFORMING DATA")
+                logger.info("-" * 80)
+                transformed_data = self.transform_data(extracted_data, tables)
+
+                # LOAD
+                logger.info("\n[STEP 3/3] LOADING DATA")
+                logger. info("-" * 80)
+                self.load_data(transformed_data)
+            self.checkpoints.finish_run('completed')
+
+            if forecast:
+                logger.info("\n[FORECAST] NEXT-TERM COURSE DEMAND")
+                logger.info("-" * 80)
+                self.forecast_demand()
 
             # Generate Reports
             self.generate_reports()
@@ -81,21 +140,176 @@ class ETLPipeline:
 
         except Exception as e:
             logger.error(f"\nETL Pipeline Failed: {str(e)}")
+            self.error = str(e)
+            if isinstance(e, LoadAborted):
+                # The run now belongs to whoever took over the job; leave its status alone
+                return False
+            if self.run_id:
+                self._mark_run_failed()
+                logger.info(f"Resume with: python etl.py --resume {self.run_id}")
             return False
         finally:
+            self.rejects.close()
             if self.loader. conn:
                 self.loader. disconnect()
 
+    def run_forecast(self):
+        """Run only the forecasting stage against the current database"""
+        try:
+            self.forecast_demand()
+            return True
+        except Exception as e:
+            logger.error(f"Forecast failed: {str(e)}")
+            return False
+        finally:
+            self.rejects.close()
+            if self.loader.conn:
+                self.loader.disconnect()
+
+    def forecast_demand(self):
+        """Forecast next-term demand for every course into course_demand_forecast"""
+        if not self.loader.conn:
+            self.loader.connect()
+
+        forecast = DemandForecaster(self.loader.conn).run()
+        if not forecast.empty:
+            logger.info(
+                f"Trends: {forecast['trend'].value_counts().to_dict()}")
+        return forecast
+
+    def start_checkpoint(self):
+        """Register this run, or pick up the progress of the run being resumed"""
+        self.checkpoints = CheckpointStore(self.loader.conn)
+        self.checkpoints.ensure_tables()
+        self.loader.checkpoints = self.checkpoints
+
+        if self.resume_run_id:
+            source_type, source_path = self.checkpoints.resume_run(
+                self.resume_run_id)
+            # Default to the source recorded for the original run
+            if source_type == 'rejects':
+                self.replay_file = self.replay_file or source_path
+            else:
+                self.source_type = self.source_type or source_type
+                if not self.source_path and source_path:
+                    self.source_path = source_path.split(os.pathsep)
+                self._check_source_files(self.checkpoints.source_files)
+        elif self.replay_file:
+            self.checkpoints.start_run('rejects', self.replay_file)
+        else:
+            self.checkpoints.start_run(self.source_type, self._source_path_str(),
+                                       self._get_extractor().source_files())
+
+        self.run_id = self.checkpoints.run_id
+        logger.info(f"Run ID: {self.run_id}")
+
+    def _source_path_str(self):
+        """Source path(s) as stored in the run record"""
+        if isinstance(self.source_path, (list, tuple)):
+            return os.pathsep.join(self.source_path)
+        return self.source_path
+
+    def _check_source_files(self, recorded):
+        """Refuse to resume when a directory or glob now resolves to other files
+
+        Checkpoint offsets count rows of the files the run started with.
+        """
+        if recorded is None:
+            return
+        current = self._get_extractor().source_files()
+        if current != recorded:
+            added = sorted(set(current) - set(recorded))
+            removed = sorted(set(recorded) - set(current))
+            raise ValueError(
+                f"Source files changed since run {self.resume_run_id} started "
+                f"(added: {', '.join(added) or 'none'}; removed: {', '.join(removed) or 'none'}); "
+                f"start a new run instead of resuming")
+
+    def _mark_run_failed(self):
+        """Best-effort status update; the connection may be what failed"""
+        try:
+            self.loader.conn.rollback()
+            self.checkpoints.finish_run('failed')
+        except Exception as e:
+            logger.warning(f"Could not mark run {self.run_id} as failed: {str(e)}")
+
+    def _get_extractor(self):
+        if self.extractor is None:
+            self.extractor = DataExtractor(
+                source_type=self.source_type,
+                source_path=self.source_path,
+                spreadsheet_id=self.spreadsheet_id,
+                credentials_file=self.credentials_file,
+                table=self.explicit_table
+            )
+        return self.extractor
+
+    def can_stream_excel(self):
+        """Excel workbooks are streamed instead of read whole"""
+        return (not self.replay_file and self.source_type == 'excel'
+                and self._get_extractor().can_stream_excel())
+
+    def stream_excel(self, tables=None):
+        """Extract, transform and load workbooks chunk by chunk
+
+        Sheets are mapped to tables from their header rows alone; sheets
+        whose table is not requested (or already completed by a resumed run)
+        are never parsed. Tables are then streamed in FK order, each
+        BATCH_SIZE chunk loaded and checkpointed before the next is read, so
+        only one chunk and the dedup keys are held in memory.
+        """
+        extractor = self._get_extractor()
+        sheets = {}
+        for path, sheet, dataset, columns in extractor.excel_sheets():
+            table_name = self._infer_table_name(dataset, pd.DataFrame(columns=columns))
+            if tables and table_name not in tables:
+                logger.info(f"Skipping sheet: {dataset}")
+                continue
+            if table_name not in self.TRANSFORMERS or table_name not in self.LOADERS:
+                logger.warning(f"No transformer/loader defined for:  {table_name}")
+                continue
+            if self.checkpoints and self.checkpoints.is_complete(table_name):
+                logger.info(f"\nSkipping {dataset}: {table_name} completed in run {self.run_id}")
+                continue
+            # {table: {path: [(sheet, dataset, columns)]}}, paths in resolved order
+            sheets.setdefault(table_name, {}).setdefault(path, []).append((sheet, dataset, columns))
+
+        for table_name in self.LOAD_ORDER:
+            if table_name not in sheets:
+                continue
+            self.loader.check_aborted()
+            load = getattr(self.loader, self.LOADERS[table_name])
+
+            with self.loader.table_lock(table_name):
+                for path, path_sheets in sheets[table_name].items():
+                    for dataset, chunks in extractor.stream_excel(path, path_sheets, table_name):
+                        # Sheets finished by an earlier attempt are still transformed
+                        # (their keys dedup later sheets) but not loaded again
+                        done = self.checkpoints and self.checkpoints.is_complete(table_name, dataset)
+                        position = 0
+                        for df in chunks:
+                            cleaned = self._transform_table(table_name, df, dataset)
+                            if not done:
+                                load(cleaned, dataset=dataset, position=position)
+                            position += len(cleaned)
+                        if done:
+                            logger.info(f"Skipped loading {dataset}: loaded by an earlier attempt")
+                        else:
+                            self.loader.finish_table(table_name, dataset)
+                self.loader.finish_table(table_name)
+
+        logger.info(f"\nStreaming completed: {len(sheets)} tables")
+
     def extract_data(self):
         """Extract data from source"""
-        self.extractor = DataExtractor(
-            source_type=self.source_type,
-            source_path=self.source_path,
-            spreadsheet_id=self.spreadsheet_id,
-            credentials_file=self.credentials_file
-        )
-
-        extracted_data = self.extractor. extract()
+        if self.replay_file:
+            # Re-feed corrected rejects instead of the whole source
+            extracted_data = read_rejects(self.replay_file)
+            logger.info(
+                f"Replaying rejects from {self.replay_file}: {len(extracted_data)} tables")
+            return extracted_data
+
+        extracted_data = self._get_extractor().extract()
         logger.info(f"Extraction completed: {len(extracted_data)} datasets")
         return extracted_data
 
@@ -103,6 +317,8 @@ class ETLPipeline:
         """Transform and validate data"""
         transformed = {}
 
+        # Group datasets (files/sheets) by target table
+        grouped = {}
         for sheet_name, df in extracted_data.items():
             # Try to infer table name from file path or sheet name
             table_name = self._infer_table_name(sheet_name, df)
@@ -111,26 +327,39 @@ class ETLPipeline:
             if tables and table_name not in tables:
                 continue
 
-            logger.info(f"\nTransforming:  {sheet_name} to {table_name}")
-
-            if table_name == 'department':
-                transformed[table_name] = self.transformer.transform_departments(
-                    df)
-            elif table_name == 'student':
-                transformed[table_name] = self.transformer.transform_students(
-                    df)
-            elif table_name == 'course':
-                transformed[table_name] = self.transformer.transform_courses(
-                    df)
-            elif table_name == 'instructor':
-                transformed[table_name] = self.transformer.transform_instructors(
-                    df)
-            else:
-                logger.warning(f"No transformer defined for:  {table_name}")
+            # Skip tables a resumed run already finished
+            if self.checkpoints and self.checkpoints.is_complete(table_name):
+                logger.info(f"\nSkipping {sheet_name}: {table_name} completed in run {self.run_id}")
+                continue
+
+            grouped.setdefault(table_name, []).append((sheet_name, df))
+
+        for table_name, datasets in grouped.items():
+            sources = [name for name, _ in datasets]
+            logger.info(f"\nTransforming:  {', '.join(sources)} to {table_name}")
+
+            # One cleaned frame per dataset, so each is checkpointed on its own;
+            # duplicates are still dropped across datasets (the first one wins)
+            parts = []
+            for source, df in datasets:
+                cleaned = self._transform_table(table_name, df, source)
+                if cleaned is not None:
+                    parts.append((source, cleaned))
+            if parts:
+                transformed[table_name] = parts
 
         logger.info(f"\nTransformation completed: {len(transformed)} tables")
         return transformed
 
+    def _transform_table(self, table_name, df, source=None):
+        """Run the table's transformer; None if there is none"""
+        if table_name not in self.TRANSFORMERS:
+            logger.warning(f"No transformer defined for:  {table_name}")
+            return None
+        self.transformer.reject_malformed(table_name, df, source)
+        transform = getattr(self.transformer, self.TRANSFORMERS[table_name])
+        return transform(df, source=source)
+
     def _infer_table_name(self, sheet_name, df):
         """Infer table name from sheet name or column names"""
         
@@ -179,28 +408,29 @@ class ETLPipeline:
             'enrollments': 'enrollment',
         }
 
-        return table_mappings.get(sheet_name.lower(), sheet_name. lower())
+        # "registrar.xlsx:Students" / "cs/students.csv" -> "students"
+        base_name = os.path.splitext(os.path.basename(sheet_name.split(':')[-1]))[0].lower()
+        return table_mappings.get(base_name, base_name)
 
     def load_data(self, transformed_data):
         """Load data into database"""
-        self.loader.connect()
+        if not self.loader.conn:
+            self.loader.connect()
 
         # Load in correct order (respecting foreign keys)
-        load_order = ['department', 'instructor', 'student', 'course',
-                      'classroom', 'schedule', 'enrollment']
-
-        for table_name in load_order:
-            if table_name in transformed_data:
-                df = transformed_data[table_name]
-                logger.info(f"\nLoading {table_name}:  {len(df)} records")
-
-                if table_name == 'department':
-                    self.loader.load_departments(df)
-                elif table_name == 'student':
-                    self.loader. load_students(df)
-                elif table_name == 'course':
-                    self.loader. load_courses(df)
-                # Add more loaders as needed
+        for table_name in self.LOAD_ORDER:
+            # Add more loaders to LOADERS as needed
+            if table_name in transformed_data and table_name in self.LOADERS:
+                self.loader.check_aborted()
+                load = getattr(self.loader, self.LOADERS[table_name])
+
+                # Concurrent runs/workers take turns per table instead of deadlocking
+                with self.loader.table_lock(table_name):
+                    for dataset, df in transformed_data[table_name]:
+                        logger.info(f"\nLoading {table_name} from {dataset}:  {len(df)} records")
+                        load(df, dataset=dataset)
+                        self.loader.finish_table(table_name, dataset)
+                    self.loader.finish_table(table_name)
 
         logger.info("\nLoading completed")
 
@@ -224,9 +454,12 @@ class ETLPipeline:
             f"Invalid Records: {validation_report['statistics']['invalid_records']}")
         logger.info(
             f"Duplicates Removed: {validation_report['statistics']['duplicates_removed']}")
+        if validation_report['rejects_file']:
+            logger.info(
+                f"Rejected rows written to: {validation_report['rejects_file']}")
 
         # Load Report
-        load_stats = self.loader.get_load_stats()
+        load_stats = dict(self.loader.get_load_stats(), run_id=self.run_id)
         load_file = f"{Config.REPORT_DIR}/load_report_{timestamp}. json"
 
         with open(load_file, 'w') as f:
@@ -242,20 +475,31 @@ def main():
     parser = argparse.ArgumentParser(
         description='ETL Pipeline for University Database')
 
-    parser.add_argument('--source', required=True,
+    parser.add_argument('--source',
                         choices=['google_sheets', 'csv', 'json', 'excel'],
                         help='Data source type')
-    parser.add_argument('--path', help='Path to CSV/JSON/Excel file')
+    parser.add_argument('--path', nargs='+',
+                        help='CSV/JSON/Excel file(s), directories or glob patterns')
     parser.add_argument('--spreadsheet-id', help='Google Sheets ID')
     parser.add_argument('--credentials', help='Google credentials JSON file')
     parser.add_argument('--tables', nargs='+',
                         help='Specific tables to process')
     parser.add_argument(
         '--table', help='Explicit table name (department, student, course, etc.)')  # NEW
+    parser.add_argument('--replay-rejects', metavar='REJECTS_FILE',
+                        help='Re-run a corrected rejects file (.jsonl) instead of a source')
+    parser.add_argument('--resume', metavar='RUN_ID',
+                        help='Resume a failed run, skipping tables and batches it already committed')
+    parser.add_argument('--forecast', action='store_true',
+                        help='Forecast next-term course demand after loading (or on its own without a source)')
 
     args = parser.parse_args()
 
     # Validate arguments
+    if not args.source and not (args.replay_rejects or args.resume or args.forecast):
+        parser.error(
+            "--source is required unless --replay-rejects, --resume or --forecast is given")
+
     if args.source in ['csv', 'json', 'excel'] and not args.path:
         parser.error(f"--path is required for {args.source} source")
 
@@ -268,10 +512,15 @@ def main():
         source_path=args.path,
         spreadsheet_id=args. spreadsheet_id,
         credentials_file=args.credentials,
-        explicit_table=args.table  # NEW
+        explicit_table=args.table,  # NEW
+        replay_file=args.replay_rejects,
+        resume_run_id=args.resume
     )
 
-    success = pipeline.run(tables=args.tables)
+    if not args.source and not (args.replay_rejects or args.resume):
+        success = pipeline.run_forecast()
+    else:
+        success = pipeline.run(tables=args.tables, forecast=args.forecast)
     sys.exit(0 if success else 1)
 
 if __name__ == '__main__':
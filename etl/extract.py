@@ -1,20 +1,51 @@
 import gspread
 from google.oauth2.service_account import Credentials
 import pandas as pd
+import glob
 import json
+import os
+import openpyxl
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from config import Config
+from schema_types import read_csv, load_schema
 from utils.logger import setup_logger
 
 logger = setup_logger('Extract')
 
 
+def _read_file(path, name):
+    """Read one file into {dataset_name: DataFrame}; runs in a worker process"""
+    reader = Config.FILE_EXTENSIONS[os.path.splitext(path)[1].lower()]
+
+    if reader == 'csv':
+        return {name: read_csv(path)}
+    elif reader == 'excel':
+        sheets = pd.read_excel(path, sheet_name=None)
+        return {f"{name}:{sheet}": df for sheet, df in sheets.items()}
+    else:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            return {f"{name}:{k}": pd.DataFrame(v) for k, v in data.items()}
+        return {name: pd.DataFrame(data)}
+
+
 class DataExtractor:
     """Extract data from various sources"""
 
-    def __init__(self, source_type, source_path=None, spreadsheet_id=None, credentials_file=None):
+    def __init__(self, source_type, source_path=None, spreadsheet_id=None, credentials_file=None, table=None):
         self.source_type = source_type
-        self.source_path = source_path
+        # --path may be a single file or a list of files, directories and globs
+        if isinstance(source_path, (list, tuple)):
+            self.source_paths = list(source_path)
+        else:
+            self.source_paths = [source_path] if source_path else []
+        self.source_path = self.source_paths[0] if self.source_paths else None
         self.spreadsheet_id = spreadsheet_id
         self.credentials_file = credentials_file
+        # Explicit table of a single-table file; selects the schema types for CSV
+        self.table = table
 
     def extract(self, sheet_name=None):
         """Extract data based on source type"""
@@ -22,6 +53,8 @@ class DataExtractor:
 
         if self. source_type == 'google_sheets':
             return self._extract_from_google_sheets(sheet_name)
+        elif not (len(self.source_paths) == 1 and os.path.isfile(self.source_path)):
+            return self._extract_from_files(self._resolve_paths())
         elif self.source_type == 'csv':
             return self._extract_from_csv()
         elif self.source_type == 'json':
@@ -31,6 +64,59 @@ class DataExtractor:
         else:
             raise ValueError(f"Unsupported source type: {self.source_type}")
 
+    def source_files(self):
+        """Absolute paths of the files extract() reads, in order (None for Google Sheets)"""
+        if self.source_type == 'google_sheets':
+            return None
+        if len(self.source_paths) == 1 and os.path.isfile(self.source_path):
+            return [os.path.abspath(self.source_path)]
+        return [os.path.abspath(path) for path in self._resolve_paths()]
+
+    def _resolve_paths(self):
+        """Expand directories and glob patterns into a sorted list of supported files"""
+        paths = set()
+        for entry in self.source_paths:
+            if os.path.isdir(entry):
+                candidates = [os.path.join(entry, name) for name in os.listdir(entry)]
+            elif any(ch in entry for ch in '*?['):
+                candidates = glob.glob(entry, recursive=True)
+            else:
+                candidates = [entry]
+
+            for path in candidates:
+                if os.path.isfile(path) and os.path.splitext(path)[1].lower() in Config.FILE_EXTENSIONS:
+                    paths.add(path)
+
+        if not paths:
+            raise ValueError(
+                f"No CSV/JSON/Excel files found in: {', '.join(self.source_paths)}")
+        # Sorted so dataset order (and resume offsets) are stable between runs
+        return sorted(paths)
+
+    @staticmethod
+    def _dataset_names(paths):
+        """Unique dataset name per file: its path relative to the files' common directory"""
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths])
+        return [os.path.relpath(os.path.abspath(p), root) for p in paths]
+
+    def _extract_from_files(self, paths):
+        """Extract many files concurrently, one worker process per file"""
+        workers = max(1, min(Config.MAX_WORKERS, len(paths)))
+        logger.info(f"Extracting {len(paths)} files with {workers} workers")
+
+        all_data = {}
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # map() keeps results in path order
+                for datasets in executor.map(_read_file, paths, self._dataset_names(paths)):
+                    for name, df in datasets.items():
+                        all_data[name] = df
+                        logger.info(f"Extracted {len(df)} rows from: {name}")
+            return all_data
+        except Exception as e:
+            logger.error(f"Error extracting files: {str(e)}")
+            raise
+
     def _extract_from_google_sheets(self, sheet_name):
         """Extract from Google Sheets"""
         try:
@@ -70,7 +156,7 @@ class DataExtractor:
     def _extract_from_csv(self):
         """Extract from CSV file"""
         try:
-            data = pd.read_csv(self.source_path)
+            data = read_csv(self.source_path, self.table)
             logger.info(
                 f"Extracted {len(data)} rows from CSV: {self.source_path}")
             return {'data': data}
@@ -116,3 +202,74 @@ class DataExtractor:
         except Exception as e:
             logger.error(f"Error extracting from Excel: {str(e)}")
             raise
+
+    def can_stream_excel(self):
+        """Whether every source is an .xlsx workbook openpyxl can stream"""
+        return (self.source_type == 'excel'
+                and all(path.lower().endswith('.xlsx') for path in self._resolve_paths()))
+
+    def excel_sheets(self):
+        """(path, sheet, dataset name, columns) of every sheet, reading only header rows"""
+        sheets = []
+        paths = self._resolve_paths()
+        for path, name in zip(paths, self._dataset_names(paths)):
+            workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+            try:
+                for sheet in workbook.sheetnames:
+                    header = next(workbook[sheet].iter_rows(max_row=1, values_only=True), None)
+                    if header:
+                        columns = [str(c).strip() if c is not None else f"Unnamed: {i}"
+                                   for i, c in enumerate(header)]
+                        sheets.append((path, sheet, f"{name}:{sheet}", columns))
+            finally:
+                workbook.close()
+        return sheets
+
+    def stream_excel(self, path, sheets, table, batch_size=None):
+        """Stream sheets of one workbook in read-only mode, batch_size rows at a time
+
+        sheets is a list of (sheet, dataset name, columns) from
+        excel_sheets() that all map to table; the workbook is opened once for
+        all of them. Yields (dataset name, chunks) per sheet, where chunks
+        yields DataFrames whose index continues across the sheet. Each
+        sheet's chunks must be consumed before moving on to the next sheet.
+        """
+        batch_size = batch_size or Config.BATCH_SIZE
+        # Excel stores dates as datetimes; DATE columns of the table get plain dates
+        date_columns = {c for c, (sql_type, _) in load_schema().get(table, {}).items() if sql_type == 'DATE'}
+
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            for sheet, name, columns in sheets:
+                yield name, self._stream_sheet(workbook[sheet], name, columns, table,
+                                               [c for c in columns if c in date_columns], batch_size)
+        finally:
+            workbook.close()
+
+    def _stream_sheet(self, worksheet, name, columns, table, date_columns, batch_size):
+        batch = []
+        start = 0
+        # min_row=2 skips the header excel_sheets() already read
+        for row in worksheet.iter_rows(min_row=2, values_only=True):
+            # Read-only sheets may report trailing blank rows
+            if all(v is None for v in row):
+                continue
+            batch.append(row[:len(columns)] + (None,) * (len(columns) - len(row)))
+            if len(batch) == batch_size:
+                yield self._excel_chunk(batch, columns, start, date_columns)
+                start += len(batch)
+                batch = []
+        if batch:
+            yield self._excel_chunk(batch, columns, start, date_columns)
+            start += len(batch)
+
+        logger.info(f"Streamed {start} rows from sheet: {name} ({table})")
+
+    @staticmethod
+    def _excel_chunk(rows, columns, start, date_columns):
+        # object dtype keeps ints as ints and blanks as None (no NaN)
+        df = pd.DataFrame(rows, columns=columns, dtype=object,
+                          index=pd.RangeIndex(start, start + len(rows)))
+        for column in date_columns:
+            df[column] = [v.date() if isinstance(v, datetime) else v for v in df[column]]
+        return df
@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+from psycopg2.extras import execute_values
+from utils.logger import setup_logger
+
+logger = setup_logger('Forecast')
+
+
+class DemandForecaster:
+    """Next-term enrollment forecast for every course in one pass
+
+    predict_course_demand() (sql/03_procedures.sql) scans enrollment history
+    once per course. Here the history of all courses is read with a single
+    query, laid out as a course x term matrix, and a least-squares trend is
+    fitted to every row at once with masked NumPy reductions.
+    """
+
+    DDL = """
+    CREATE TABLE IF NOT EXISTS course_demand_forecast (
+        course_id INTEGER NOT NULL REFERENCES course (course_id) ON DELETE CASCADE,
+        target_semester VARCHAR(20) NOT NULL,
+        target_year INTEGER NOT NULL,
+        terms_observed INTEGER NOT NULL,
+        historical_avg_enrollment NUMERIC(10, 2) NOT NULL,
+        last_semester_enrollment INTEGER NOT NULL,
+        trend_slope NUMERIC(10, 3) NOT NULL,
+        predicted_enrollment INTEGER NOT NULL,
+        trend VARCHAR(20) NOT NULL,
+        recommended_sections INTEGER NOT NULL,
+        generated_at TIMESTAMP DEFAULT NOW(),
+        PRIMARY KEY (course_id, target_semester, target_year)
+    );
+    """
+
+    HISTORY_QUERY = """
+    SELECT sch.course_id, sch.semester, sch.year, COUNT(e.enrollment_id) AS enrollment_count
+    FROM schedule sch
+    LEFT JOIN enrollment e ON sch.schedule_id = e.schedule_id
+    GROUP BY sch.course_id, sch.semester, sch.year
+    """
+
+    UPSERT_QUERY = """
+    INSERT INTO course_demand_forecast (
+        course_id, target_semester, target_year, terms_observed,
+        historical_avg_enrollment, last_semester_enrollment, trend_slope,
+        predicted_enrollment, trend, recommended_sections
+    ) VALUES %s
+    ON CONFLICT (course_id, target_semester, target_year) DO UPDATE SET
+        terms_observed = EXCLUDED.terms_observed,
+        historical_avg_enrollment = EXCLUDED.historical_avg_enrollment,
+        last_semester_enrollment = EXCLUDED.last_semester_enrollment,
+        trend_slope = EXCLUDED.trend_slope,
+        predicted_enrollment = EXCLUDED.predicted_enrollment,
+        trend = EXCLUDED.trend,
+        recommended_sections = EXCLUDED.recommended_sections,
+        generated_at = NOW()
+    """
+
+    # Academic year order; a term's index is year * 3 + position
+    SEMESTERS = ['Spring', 'Summer', 'Fall']
+    SECTION_SIZE = 30
+    # Only courses offered within this many most recent terms get a forecast
+    RECENT_TERMS = 3
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = conn.cursor()
+
+    def run(self):
+        """Forecast every course with history and store the results"""
+        self.cursor.execute(self.DDL)
+        self.conn.commit()
+
+        history = self.load_history()
+        if history.empty:
+            logger.warning("No enrollment history found, nothing to forecast")
+            return pd.DataFrame()
+
+        forecast = self.forecast(history)
+        if forecast.empty:
+            logger.warning("No recently offered courses, nothing to forecast")
+            return forecast
+        self.save(forecast)
+        return forecast
+
+    def load_history(self):
+        """Per-course, per-term enrollment counts in one query"""
+        self.cursor.execute(self.HISTORY_QUERY)
+        history = pd.DataFrame(self.cursor.fetchall(),
+                               columns=['course_id', 'semester', 'year', 'enrollment_count'])
+        logger.info(f"Loaded {len(history)} course-term rows")
+        return history
+
+    def forecast(self, history):
+        """Fit a linear trend per course and project it one term past its last offering
+
+        Courses not offered within the last RECENT_TERMS terms are skipped.
+        Trend and recommended sections use predict_course_demand()'s rules
+        (last term vs. average, CEIL(avg / 30) +/- 1); the fitted projection
+        is stored alongside as predicted_enrollment.
+        """
+        term = (history['year'].astype(int) * len(self.SEMESTERS)
+                + history['semester'].map(self.SEMESTERS.index))
+        first_term = int(term.min())
+
+        courses, row = np.unique(history['course_id'].to_numpy(), return_inverse=True)
+        col = (term - first_term).to_numpy()
+
+        # Course x term matrix; mask marks the terms a course was actually offered
+        counts = np.zeros((len(courses), int(col.max()) + 1))
+        mask = np.zeros_like(counts)
+        counts[row, col] = history['enrollment_count'].to_numpy()
+        mask[row, col] = 1.0
+        x = np.arange(counts.shape[1], dtype=float)
+
+        last_col = counts.shape[1] - 1 - np.argmax(mask[:, ::-1], axis=1)
+        recent = last_col >= counts.shape[1] - self.RECENT_TERMS
+        if not recent.all():
+            logger.info(f"Skipping {int((~recent).sum())} courses not offered in the last "
+                        f"{self.RECENT_TERMS} terms")
+        courses, counts, mask, last_col = courses[recent], counts[recent], mask[recent], last_col[recent]
+
+        # Weighted least squares over the offered terms only
+        n = mask.sum(axis=1)
+        sx = (mask * x).sum(axis=1)
+        sy = counts.sum(axis=1)
+        sxx = (mask * x * x).sum(axis=1)
+        sxy = (counts * x).sum(axis=1)
+
+        denom = n * sxx - sx * sx
+        # A single observed term has no trend
+        slope = np.divide(n * sxy - sx * sy, denom, out=np.zeros_like(denom), where=denom > 0)
+        intercept = (sy - slope * sx) / n
+        target_col = last_col + 1
+        predicted = np.maximum(np.rint(intercept + slope * target_col), 0)
+
+        avg = sy / n
+        last = counts[np.arange(len(courses)), last_col]
+
+        trend = np.select([last > avg * 1.1, last < avg * 0.9],
+                          ['Increasing', 'Decreasing'], 'Stable')
+        base_sections = np.ceil(avg / self.SECTION_SIZE)
+        sections = np.select([trend == 'Increasing', trend == 'Decreasing'],
+                             [base_sections + 1, np.maximum(base_sections - 1, 1)], base_sections)
+
+        target_year, target_position = np.divmod(target_col + first_term, len(self.SEMESTERS))
+        logger.info(f"Forecast {len(courses)} courses")
+
+        return pd.DataFrame({
+            'course_id': courses.astype(int),
+            'target_semester': np.array(self.SEMESTERS)[target_position],
+            'target_year': target_year.astype(int),
+            'terms_observed': n.astype(int),
+            'historical_avg_enrollment': avg.round(2),
+            'last_semester_enrollment': last.astype(int),
+            'trend_slope': slope.round(3),
+            'predicted_enrollment': predicted.astype(int),
+            'trend': trend,
+            'recommended_sections': sections.astype(int),
+        })
+
+    def save(self, forecast):
+        """Upsert all forecast rows in one statement"""
+        rows = [tuple(r) for r in forecast.astype(object).itertuples(index=False)]
+        try:
+            execute_values(self.cursor, self.UPSERT_QUERY, rows, page_size=len(rows))
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        logger.info(f"Saved {len(rows)} forecasts to course_demand_forecast")
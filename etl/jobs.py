@@ -0,0 +1,275 @@
+import os
+import socket
+import threading
+import time
+import psycopg2
+from utils.logger import setup_logger
+from config import Config
+
+logger = setup_logger('Jobs')
+
+
+class JobQueue:
+    """ETL jobs in a Postgres table, claimed by workers with FOR UPDATE SKIP LOCKED
+
+    A claimed job carries a lease that its worker keeps extending with
+    heartbeats. A job whose lease expired (worker crashed or lost its
+    connection) is claimable again; its run_id lets the next attempt resume
+    from the checkpoints of the previous one.
+    """
+
+    DDL = """
+    CREATE TABLE IF NOT EXISTS etl_job (
+        job_id BIGSERIAL PRIMARY KEY,
+        source_type VARCHAR(20) NOT NULL,
+        source_path TEXT,
+        tables TEXT[],
+        explicit_table VARCHAR(50),
+        status VARCHAR(20) NOT NULL DEFAULT 'queued' CHECK (
+            status IN ('queued', 'running', 'completed', 'failed')
+        ),
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL DEFAULT 3,
+        run_id VARCHAR(40),
+        worker_id VARCHAR(100),
+        lease_expires_at TIMESTAMP,
+        heartbeat_at TIMESTAMP,
+        last_error TEXT,
+        created_at TIMESTAMP DEFAULT NOW(),
+        started_at TIMESTAMP,
+        finished_at TIMESTAMP
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_etl_job_claimable
+    ON etl_job (created_at, job_id)
+    WHERE status IN ('queued', 'running');
+    """
+
+    CLAIM_QUERY = """
+    UPDATE etl_job SET
+        status = 'running',
+        worker_id = %(worker_id)s,
+        attempts = attempts + 1,
+        lease_expires_at = NOW() + %(lease)s * INTERVAL '1 second',
+        heartbeat_at = NOW(),
+        started_at = COALESCE(started_at, NOW()),
+        finished_at = NULL
+    WHERE job_id = (
+        SELECT job_id FROM etl_job
+        WHERE (status = 'queued' OR (status = 'running' AND lease_expires_at < NOW()))
+        AND attempts < max_attempts
+        ORDER BY created_at, job_id
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING job_id, source_type, source_path, tables, explicit_table, run_id, attempts, max_attempts
+    """
+
+    JOB_COLUMNS = ['job_id', 'source_type', 'source_path', 'tables', 'explicit_table',
+                   'run_id', 'attempts', 'max_attempts']
+
+    def __init__(self, conn, lease_seconds=None):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.lease_seconds = lease_seconds or Config.JOB_LEASE_SECONDS
+
+    def ensure_tables(self):
+        """Create the queue table if it does not exist yet"""
+        self.cursor.execute(self.DDL)
+        self.conn.commit()
+
+    def enqueue(self, source_type, source_path=None, tables=None, explicit_table=None, max_attempts=None):
+        """Add a job; source_path may be a list of files, directories or globs"""
+        if isinstance(source_path, (list, tuple)):
+            source_path = os.pathsep.join(source_path)
+
+        self.cursor.execute(
+            """
+            INSERT INTO etl_job (source_type, source_path, tables, explicit_table, max_attempts)
+            VALUES (%s, %s, %s, %s, %s)
+            RETURNING job_id
+            """,
+            (source_type, source_path, tables, explicit_table, max_attempts or Config.JOB_MAX_ATTEMPTS)
+        )
+        job_id = self.cursor.fetchone()[0]
+        self.conn.commit()
+        logger.info(f"Enqueued job {job_id} ({source_type}: {source_path})")
+        return job_id
+
+    def claim(self, worker_id):
+        """Claim the oldest available job, or return None when there is nothing to do"""
+        self._fail_exhausted()
+        self.cursor.execute(self.CLAIM_QUERY, {'worker_id': worker_id, 'lease': self.lease_seconds})
+        row = self.cursor.fetchone()
+        self.conn.commit()
+
+        if row is None:
+            return None
+        job = dict(zip(self.JOB_COLUMNS, row))
+        logger.info(f"Worker {worker_id} claimed job {job['job_id']} "
+                    f"(attempt {job['attempts']}/{job['max_attempts']})")
+        return job
+
+    def _fail_exhausted(self):
+        """Give up on expired jobs that have no attempts left"""
+        self.cursor.execute(
+            """
+            UPDATE etl_job SET
+                status = 'failed',
+                last_error = COALESCE(last_error, 'lease expired'),
+                finished_at = NOW()
+            WHERE status = 'running'
+            AND lease_expires_at < NOW()
+            AND attempts >= max_attempts
+            RETURNING job_id
+            """
+        )
+        for (job_id,) in self.cursor.fetchall():
+            logger.warning(f"Job {job_id} lease expired with no attempts left, marked failed")
+        self.conn.commit()
+
+    def heartbeat(self, job_id, worker_id):
+        """Extend the lease; False means it expired or the job was taken over"""
+        self.cursor.execute(
+            """
+            UPDATE etl_job SET
+                lease_expires_at = NOW() + %s * INTERVAL '1 second',
+                heartbeat_at = NOW()
+            WHERE job_id = %s AND worker_id = %s AND status = 'running'
+            AND lease_expires_at > NOW()
+            """,
+            (self.lease_seconds, job_id, worker_id)
+        )
+        owned = self.cursor.rowcount == 1
+        self.conn.commit()
+        return owned
+
+    def set_run_id(self, job_id, run_id):
+        """Remember the pipeline run so a retry resumes its checkpoints"""
+        self.cursor.execute("UPDATE etl_job SET run_id = %s WHERE job_id = %s", (run_id, job_id))
+        self.conn.commit()
+
+    def run_status(self, run_id):
+        """Status of a job's pipeline run in etl_run, None if it never started"""
+        self.cursor.execute("SELECT status FROM etl_run WHERE run_id = %s", (run_id,))
+        row = self.cursor.fetchone()
+        self.conn.commit()
+        return row[0] if row else None
+
+    def complete(self, job_id, worker_id):
+        self.cursor.execute(
+            """
+            UPDATE etl_job SET status = 'completed', finished_at = NOW(), lease_expires_at = NULL
+            WHERE job_id = %s AND worker_id = %s
+            """,
+            (job_id, worker_id)
+        )
+        self.conn.commit()
+        logger.info(f"Job {job_id} completed")
+
+    def fail(self, job_id, worker_id, error):
+        """Record a failed attempt; the job is requeued while attempts remain"""
+        self.cursor.execute(
+            """
+            UPDATE etl_job SET
+                status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE NOW() END,
+                lease_expires_at = NULL,
+                last_error = %s
+            WHERE job_id = %s AND worker_id = %s
+            RETURNING status
+            """,
+            (error, job_id, worker_id)
+        )
+        row = self.cursor.fetchone()
+        self.conn.commit()
+        if row:
+            logger.warning(f"Job {job_id} attempt failed ({error}); status now {row[0]}")
+
+    def summary(self):
+        """Job counts per status"""
+        self.cursor.execute("SELECT status, COUNT(*) FROM etl_job GROUP BY status ORDER BY status")
+        counts = dict(self.cursor.fetchall())
+        self.conn.commit()
+        return counts
+
+    def list_jobs(self, limit=20):
+        """Most recent jobs, newest first"""
+        self.cursor.execute(
+            """
+            SELECT job_id, status, source_type, source_path, tables, attempts, max_attempts,
+                   worker_id, run_id, lease_expires_at, last_error
+            FROM etl_job
+            ORDER BY job_id DESC
+            LIMIT %s
+            """,
+            (limit,)
+        )
+        columns = [d[0] for d in self.cursor.description]
+        jobs = [dict(zip(columns, row)) for row in self.cursor.fetchall()]
+        self.conn.commit()
+        return jobs
+
+
+class Heartbeat(threading.Thread):
+    """Keeps a claimed job's lease alive on its own connection
+
+    The pipeline commits per batch on the loader connection, so heartbeats
+    must not share it. expired() also checks a local deadline, so a batch
+    is never committed after the lease may have run out, even between
+    heartbeats.
+    """
+
+    def __init__(self, db_config, job_id, worker_id, lease_seconds=None):
+        super().__init__(daemon=True)
+        self.db_config = db_config
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds or Config.JOB_LEASE_SECONDS
+        self.lost = threading.Event()
+        self._stop_event = threading.Event()
+        # Local view of the lease; the job was claimed just before this
+        self.deadline = time.monotonic() + self.lease_seconds
+
+    def expired(self):
+        """Whether the lease was lost or may have run out since the last renewal"""
+        return self.lost.is_set() or time.monotonic() >= self.deadline
+
+    def run(self):
+        interval = max(self.lease_seconds / 3, 1)
+        conn = None
+        try:
+            conn = psycopg2.connect(**self.db_config)
+            queue = JobQueue(conn, self.lease_seconds)
+            while not self._stop_event.wait(interval):
+                try:
+                    renewed_at = time.monotonic()
+                    if not queue.heartbeat(self.job_id, self.worker_id):
+                        logger.error(f"Lost lease on job {self.job_id}")
+                        self.lost.set()
+                        return
+                    self.deadline = renewed_at + self.lease_seconds
+                except psycopg2.Error as e:
+                    # Keep trying until the lease runs out
+                    logger.warning(f"Heartbeat for job {self.job_id} failed: {str(e)}")
+                    if time.monotonic() >= self.deadline:
+                        logger.error(f"Lease on job {self.job_id} expired without a heartbeat")
+                        self.lost.set()
+                        return
+                    if not conn.closed:
+                        conn.rollback()
+        except Exception as e:
+            # Without a heartbeat nobody extends the lease; never let the run go on unaware
+            logger.error(f"Heartbeat for job {self.job_id} stopped: {str(e)}")
+            self.lost.set()
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
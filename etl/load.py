@@ -1,4 +1,7 @@
+import zlib
 import psycopg2
+from contextlib import contextmanager
+from psycopg2.extensions import TRANSACTION_STATUS_INERROR
 from psycopg2.extras import execute_batch
 from utils.logger import setup_logger
 from config import Config
@@ -6,13 +9,24 @@ from config import Config
 logger = setup_logger('Load')
 
 
+class LoadAborted(Exception):
+    """The run lost the right to write (e.g. its job lease) and must stop"""
+
+
 class DataLoader:
     """Load data into PostgreSQL database"""
 
+    # Advisory lock namespace for per-table write locks
+    TABLE_LOCK_NAMESPACE = 7301
+
     def __init__(self, db_config):
         self.db_config = db_config
         self.conn = None
         self.cursor = None
+        self.checkpoints = None
+        # Job lease (jobs.Heartbeat) of the worker running this load, if any
+        self.lease = None
+        self._partitioned = {}
         self.stats = {
             'inserted': 0,
             'failed': 0,
@@ -37,7 +51,28 @@ class DataLoader:
             self.conn.close()
         logger.info("Disconnected from database")
 
-    def load_departments(self, df):
+    @contextmanager
+    def table_lock(self, table_name):
+        """Session advisory lock so only one run or worker writes a table at a time
+
+        Session level (not transaction level) because loads commit per batch.
+        """
+        key = zlib.crc32(table_name.encode()) & 0x7fffffff
+        self.cursor.execute("SELECT pg_try_advisory_lock(%s, %s)", (self.TABLE_LOCK_NAMESPACE, key))
+        if not self.cursor.fetchone()[0]:
+            logger.info(f"Waiting for another ETL run to finish writing {table_name}")
+            self.cursor.execute("SELECT pg_advisory_lock(%s, %s)", (self.TABLE_LOCK_NAMESPACE, key))
+        self.conn.commit()
+
+        try:
+            yield
+        finally:
+            if self.conn.get_transaction_status() == TRANSACTION_STATUS_INERROR:
+                self.conn.rollback()
+            self.cursor.execute("SELECT pg_advisory_unlock(%s, %s)", (self.TABLE_LOCK_NAMESPACE, key))
+            self.conn.commit()
+
+    def load_departments(self, df, dataset='', position=0):
         """Load department data"""
         logger.info(f"Loading {len(df)} departments")
 
@@ -51,9 +86,9 @@ class DataLoader:
         RETURNING department_id;
         """
 
-        return self._execute_batch_insert(query, df. to_dict('records'))
+        return self._execute_batch_insert(query, df. to_dict('records'), 'department', dataset=dataset, position=position)
 
-    def load_students(self, df):
+    def load_students(self, df, dataset='', position=0):
         """Load student data"""
         logger.info(f"Loading {len(df)} students")
 
@@ -73,9 +108,9 @@ class DataLoader:
         RETURNING student_id;
         """
 
-        return self._execute_batch_insert(query, df.to_dict('records'))
+        return self._execute_batch_insert(query, df.to_dict('records'), 'student', dataset=dataset, position=position)
 
-    def load_courses(self, df):
+    def load_courses(self, df, dataset='', position=0):
         """Load course data"""
         logger.info(f"Loading {len(df)} courses")
 
@@ -94,25 +129,181 @@ class DataLoader:
         RETURNING course_id;
         """
 
-        return self._execute_batch_insert(query, df.to_dict('records'))
+        return self._execute_batch_insert(query, df.to_dict('records'), 'course', dataset=dataset, position=position)
+
+    def load_schedules(self, df, dataset='', position=0):
+        """Load schedule data, creating the year partitions first when partitioned
+
+        Rows go through the parent table even when it is partitioned, so
+        Postgres routes them and the parent's triggers (classroom occupancy
+        sync) fire.
+        """
+        logger.info(f"Loading {len(df)} schedules")
+
+        query = """
+        INSERT INTO schedule (course_id, instructor_id, classroom_id, semester, year,
+                              day_of_week, start_time, end_time)
+        VALUES (%(course_id)s, %(instructor_id)s, %(classroom_id)s, %(semester)s, %(year)s,
+                %(day_of_week)s, %(start_time)s, %(end_time)s)
+        ON CONFLICT (classroom_id, day_of_week, start_time, semester, year) DO UPDATE SET
+            course_id = EXCLUDED.course_id,
+            instructor_id = EXCLUDED.instructor_id,
+            end_time = EXCLUDED.end_time
+        RETURNING schedule_id;
+        """
+
+        records = df.to_dict('records')
+        if self._is_partitioned('schedule'):
+            self._ensure_year_partitions({r['year'] for r in records})
+        inserted = self._execute_batch_insert(query, records, 'schedule', dataset=dataset, position=position)
+
+        self._rebuild_classroom_occupancy({(r['semester'], r['year']) for r in records})
+        return inserted
 
-    def _execute_batch_insert(self, query, data):
-        """Execute batch insert with error handling"""
+    def load_enrollments(self, df, dataset='', position=0):
+        """Load enrollment data, adding the partition key (year) when partitioned
+
+        Rows go through the parent table so the statement-level
+        enrollment-count triggers defined on it fire for ETL loads too.
+        """
+        logger.info(f"Loading {len(df)} enrollments")
+
+        records = df.to_dict('records')
+        if not self._is_partitioned('enrollment'):
+            query = """
+            INSERT INTO enrollment (student_id, schedule_id, enrollment_date, grade, status)
+            VALUES (%(student_id)s, %(schedule_id)s, COALESCE(%(enrollment_date)s, CURRENT_DATE),
+                    %(grade)s, %(status)s)
+            ON CONFLICT (student_id, schedule_id) DO UPDATE SET
+                grade = EXCLUDED.grade,
+                status = EXCLUDED.status
+            RETURNING enrollment_id;
+            """
+            return self._execute_batch_insert(query, records, 'enrollment', dataset=dataset, position=position)
+
+        query = """
+        INSERT INTO enrollment (student_id, schedule_id, year, enrollment_date, grade, status)
+        VALUES (%(student_id)s, %(schedule_id)s, %(year)s, COALESCE(%(enrollment_date)s, CURRENT_DATE),
+                %(grade)s, %(status)s)
+        ON CONFLICT (student_id, schedule_id, year) DO UPDATE SET
+            grade = EXCLUDED.grade,
+            status = EXCLUDED.status
+        RETURNING enrollment_id;
+        """
+
+        # Partition key comes from the schedule each enrollment belongs to;
+        # unknown schedules keep a NULL year and fail like any FK violation
+        self.cursor.execute(
+            "SELECT schedule_id, year FROM schedule WHERE schedule_id = ANY(%s)",
+            (list({r['schedule_id'] for r in records}),)
+        )
+        schedule_years = dict(self.cursor.fetchall())
+        for record in records:
+            record['year'] = schedule_years.get(record['schedule_id'])
+
+        return self._execute_batch_insert(query, records, 'enrollment', dataset=dataset, position=position)
+
+    def _is_partitioned(self, table_name):
+        """Whether a table has been migrated to partitions (07_partitioning.sql)"""
+        if table_name not in self._partitioned:
+            self.cursor.execute(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass)",
+                (table_name,)
+            )
+            self._partitioned[table_name] = self.cursor.fetchone()[0]
+        return self._partitioned[table_name]
+
+    def _ensure_year_partitions(self, years):
+        """Create missing year partitions before routing rows into them"""
+        for year in sorted(years):
+            self.cursor.execute("SELECT ensure_year_partitions(%s)", (year,))
+        self.conn.commit()
+
+    def _rebuild_classroom_occupancy(self, terms):
+        """Rebuild the occupancy index for the loaded terms (09_classroom_occupancy.sql)
+
+        Normally trg_sync_classroom_occupancy has already mirrored every row,
+        so this only runs when the index exists without its trigger (e.g.
+        after migrate_to_term_partitions() recreated schedule).
+        """
+        self.cursor.execute(
+            """
+            SELECT to_regproc('rebuild_classroom_occupancy') IS NOT NULL,
+                   EXISTS (SELECT 1 FROM pg_trigger
+                           WHERE tgrelid = 'schedule'::regclass
+                           AND tgname = 'trg_sync_classroom_occupancy')
+            """
+        )
+        has_index, has_trigger = self.cursor.fetchone()
+        self.conn.commit()
+        if not has_index or has_trigger:
+            return
+
+        logger.warning("trg_sync_classroom_occupancy is missing; re-run sql/09_classroom_occupancy.sql")
+        for semester, year in sorted(terms):
+            self.cursor.execute("SELECT rebuild_classroom_occupancy(%s, %s)", (semester, year))
+        self.conn.commit()
+        logger.info(f"Rebuilt classroom occupancy for {len(terms)} term(s)")
+
+    def check_aborted(self):
+        """Raise LoadAborted if the run's job lease is lost or may have run out"""
+        if self.lease is not None and self.lease.expired():
+            raise LoadAborted("Load aborted: job lease lost")
+
+    def finish_table(self, table_name, dataset=''):
+        """Record that one dataset of a table (or, without one, the whole table) is loaded"""
+        if self.checkpoints:
+            self.check_aborted()
+            self.checkpoints.complete_table(table_name, dataset)
+            self.conn.commit()
+
+    def _execute_batch_insert(self, query, data, table_name, dataset='', position=0):
+        """Execute batch insert with error handling, committing every BATCH_SIZE records
+
+        Progress is checkpointed per (table, dataset), so a resumed run picks
+        each file up where it stopped. position is where data starts within
+        its dataset when a dataset is loaded in chunks; finish_table() marks
+        the dataset complete once all of it is loaded.
+        """
         inserted = 0
         failed = 0
 
+        if self.checkpoints and self.checkpoints.is_complete(table_name, dataset):
+            logger.info(f"Skipping {table_name} from {dataset}: loaded by an earlier attempt")
+            return 0
+
+        # Skip rows a previous attempt of this run already committed
+        done = self.checkpoints.offset(table_name, dataset) if self.checkpoints else 0
+        start = min(max(done - position, 0), len(data))
+        # Chunks an earlier attempt committed whole are skipped quietly
+        if start and (position == 0 or start < len(data)):
+            logger.info(f"Resuming {table_name} from {dataset or 'source'} at record {done}")
+
         try:
-            for record in data:
-                try:
-                    self.cursor. execute(query, record)
-                    inserted += 1
-                except psycopg2.Error as e:
-                    logger.warning(f"Failed to insert record: {str(e)}")
-                    failed += 1
-                    self.conn.rollback()
-                    continue
+            for offset in range(start, len(data), Config.BATCH_SIZE):
+                batch = data[offset:offset + Config.BATCH_SIZE]
+
+                for record in batch:
+                    # Savepoint so one bad record does not undo the rest of the batch
+                    self.cursor.execute("SAVEPOINT etl_record")
+                    try:
+                        self.cursor.execute(query, record)
+                        self.cursor.execute("RELEASE SAVEPOINT etl_record")
+                        inserted += 1
+                    except psycopg2.Error as e:
+                        logger.warning(f"Failed to insert record: {str(e)}")
+                        failed += 1
+                        self.cursor.execute("ROLLBACK TO SAVEPOINT etl_record")
+                        continue
+
+                # Never commit a batch once another worker may own the run
+                self.check_aborted()
+
+                # Progress is committed atomically with the batch it describes
+                if self.checkpoints:
+                    self.checkpoints.advance(table_name, position + offset + len(batch), dataset)
+                self.conn.commit()
 
-            self.conn.commit()
             self.stats['inserted'] += inserted
             self.stats['failed'] += failed
 
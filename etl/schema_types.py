@@ -0,0 +1,181 @@
+import csv
+import re
+from functools import lru_cache
+import pandas as pd
+from config import Config
+from utils.logger import setup_logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+except ImportError:  # optional: without pyarrow every CSV goes through pandas
+    pa = None
+
+logger = setup_logger('SchemaTypes')
+
+_TABLE_RE = re.compile(r'^CREATE TABLE (\w+) \((.*?)^\);', re.I | re.M | re.S)
+# Column definitions only (4-space indent); constraint lines never start with a type keyword
+_COLUMN_RE = re.compile(
+    r'^ {4}(\w+)\s+(VARCHAR|CHAR|TEXT|SERIAL|INTEGER|TIMESTAMP|DATE|TIME)\b(?:\((\d+)\))?',
+    re.I | re.M)
+
+
+@lru_cache(maxsize=None)
+def load_schema(path=None):
+    """Parse schema.sql into {table: {column: (sql_type, length)}}"""
+    path = path or Config.SCHEMA_FILE
+    try:
+        with open(path, 'r') as f:
+            sql = f.read()
+    except OSError as e:
+        logger.warning(f"Schema file not available ({e}); CSV columns will be inferred")
+        return {}
+
+    schema = {}
+    for table, body in _TABLE_RE.findall(sql):
+        schema[table.lower()] = {
+            column: (sql_type.upper(), int(length) if length else None)
+            for column, sql_type, length in _COLUMN_RE.findall(body)
+        }
+    return schema
+
+
+def arrow_type(sql_type):
+    """Arrow type a schema column is parsed as"""
+    return {
+        'VARCHAR': pa.string(),
+        'CHAR': pa.string(),
+        'TEXT': pa.string(),
+        'SERIAL': pa.int64(),
+        'INTEGER': pa.int64(),
+        'DATE': pa.date32(),
+        'TIME': pa.time32('s'),
+        'TIMESTAMP': pa.timestamp('us'),
+    }[sql_type]
+
+
+def match_table(columns, schema, table=None):
+    """Table whose definition best matches a header (explicit table wins)"""
+    if table:
+        return table if table in schema else None
+
+    def score(name):
+        defined = schema[name]
+        matched = sum(1 for c in columns if c in defined)
+        return matched, -(len(defined) - matched)
+
+    best = max(schema, key=score, default=None)
+    if best is None or score(best)[0] == 0:
+        return None
+    return best
+
+
+def read_csv(path, table=None):
+    """Read a CSV with column types taken from schema.sql
+
+    Known columns are parsed by pyarrow's multithreaded reader straight
+    into their schema types (unknown columns as strings), so nothing is
+    inferred. If a value does not parse as its type, the file is read once
+    more as strings and each typed column is cast on its own; columns with
+    bad values stay text, so the bad values reach the transformer's
+    validators as they were written. Rows with too few or too many fields
+    are skipped and listed in df.attrs['malformed_rows'] for the rejects
+    file. Falls back to pandas inference when pyarrow is missing or the
+    engine is set to 'pandas'.
+    """
+    if pa is None or Config.CSV_ENGINE != 'pyarrow':
+        return pd.read_csv(path)
+
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        header = next(csv.reader(f), [])
+
+    schema = load_schema()
+    table = match_table(header, schema, table)
+    columns = schema.get(table, {})
+    column_types = {
+        name: arrow_type(columns[name][0]) if name in columns else pa.string()
+        for name in header
+    }
+
+    malformed = []
+
+    def skip_malformed(row):
+        # Called from the reader's threads; list.append is thread-safe
+        malformed.append(row)
+        return 'skip'
+
+    try:
+        arrow_table = _read_arrow_csv(path, column_types, skip_malformed)
+    except pa.ArrowInvalid as e:
+        logger.warning(f"Typed read of {path} failed, casting column by column: {str(e)}")
+        malformed.clear()
+        arrow_table = _read_arrow_csv(path, dict.fromkeys(header, pa.string()), skip_malformed)
+        for name, column_type in column_types.items():
+            if column_type == pa.string():
+                continue
+            try:
+                column = _cast_column(arrow_table[name], column_type)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                logger.warning(f"{path}: {table}.{name} has values that are not "
+                               f"{columns[name][0]}, reading the column as text")
+                continue
+            arrow_table = arrow_table.set_column(arrow_table.column_names.index(name), name, column)
+
+    _warn_over_length(arrow_table, columns, table)
+    df = arrow_table.to_pandas(integer_object_nulls=True, date_as_object=True)
+    if malformed:
+        logger.warning(f"{path}: skipped {len(malformed)} rows with the wrong number of fields")
+        df.attrs['malformed_rows'] = [_malformed_entry(row, header) for row in malformed]
+    return df
+
+
+def _read_arrow_csv(path, column_types, invalid_row_handler):
+    return pa_csv.read_csv(
+        path,
+        parse_options=pa_csv.ParseOptions(invalid_row_handler=invalid_row_handler),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=column_types,
+            strings_can_be_null=True
+        )
+    )
+
+
+def _cast_column(column, column_type):
+    """Cast a string column to its schema type; ArrowInvalid on any bad value"""
+    if not pa.types.is_time(column_type):
+        return pc.cast(column, column_type)
+
+    # No string -> time cast; accept what the CSV reader does (HH:MM:SS or HH:MM)
+    parsed = pc.coalesce(*(
+        pc.strptime(column, format=time_format, unit='s', error_is_null=True)
+        for time_format in ('%H:%M:%S', '%H:%M')
+    ))
+    if parsed.null_count != column.null_count:
+        raise pa.ArrowInvalid(f"values that are not times in column of type {column_type}")
+    return pc.cast(parsed, column_type)
+
+
+def _malformed_entry(row, header):
+    """Rejects entry for a row pyarrow could not split into the header's columns"""
+    values = next(csv.reader([row.text]), [])
+    record = dict(zip(header, values))
+    if len(values) > len(header):
+        record['_extra'] = values[len(header):]
+    # The line number is only known when the file was read on one thread
+    line = f" (line {row.number})" if row.number is not None else ''
+    return {
+        'errors': [f"Malformed row: expected {row.expected_columns} fields, got {row.actual_columns}{line}"],
+        'record': record
+    }
+
+
+def _warn_over_length(arrow_table, columns, table):
+    """Report values longer than their VARCHAR(n); the transformer truncates them"""
+    for name, (sql_type, length) in columns.items():
+        if not length or name not in arrow_table.column_names:
+            continue
+        lengths = pc.utf8_length(arrow_table[name])
+        too_long = pc.sum(pc.greater(lengths, length)).as_py() or 0
+        if too_long:
+            logger.warning(f"{too_long} values in {table}.{name} exceed {sql_type}({length})")
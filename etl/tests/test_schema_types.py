@@ -0,0 +1,91 @@
+"""
+Schema-typed CSV reader tests (no database needed)
+
+    python -m unittest discover -s tests
+"""
+
+import datetime
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from schema_types import load_schema, pa, read_csv
+from transform import DataTransformer
+from utils.rejects import RejectsWriter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STUDENTS = """first_name,last_name,email,phone,date_of_birth,enrollment_year,department_id,status
+John,Doe,john.doe@student.edu,555-1001,2003-05-15,2022,1,Active
+Jane,Smith,jane.smith@student.edu
+Mike,Johnson,mike.johnson@student.edu,555-1003,2003-11-10,2022,1,Active,extra
+Ann,Lee,ann.lee@student.edu,555-1004,15/05/2003,2021,1,Active
+"""
+
+
+@unittest.skipUnless(pa is not None, 'pyarrow is not installed')
+class ReadCsvTest(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = (Config.SCHEMA_FILE, Config.CSV_ENGINE)
+        Config.SCHEMA_FILE = os.path.join(ROOT, 'Task3', 'schema.sql')
+        Config.CSV_ENGINE = 'pyarrow'
+        load_schema.cache_clear()
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        Config.SCHEMA_FILE, Config.CSV_ENGINE = self.saved
+        load_schema.cache_clear()
+        self.tmp.cleanup()
+
+    def write_csv(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_malformed_rows_are_skipped_and_rejected(self):
+        df = read_csv(self.write_csv('students.csv', STUDENTS), 'student')
+
+        self.assertEqual(list(df['first_name']), ['John', 'Ann'])
+        malformed = df.attrs['malformed_rows']
+        self.assertEqual([m['record']['first_name'] for m in malformed], ['Jane', 'Mike'])
+        self.assertEqual(malformed[1]['record']['_extra'], ['extra'])
+        self.assertIn('expected 8 fields, got 3', malformed[0]['errors'][0])
+
+        # The bad date only turns its own column into text
+        self.assertEqual(list(df['date_of_birth']), ['2003-05-15', '15/05/2003'])
+        self.assertEqual(list(df['enrollment_year']), [2022, 2021])
+
+        rejects = RejectsWriter(os.path.join(self.tmp.name, 'rejects.jsonl'))
+        transformer = DataTransformer(rejects=rejects)
+        transformer.reject_malformed('student', df, source='students.csv')
+        cleaned = transformer.transform_students(df, source='students.csv')
+        rejects.close()
+
+        self.assertEqual(list(cleaned['first_name']), ['John'])
+        with open(rejects.path) as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual([e['record']['first_name'] for e in entries], ['Jane', 'Mike', 'Ann'])
+        self.assertEqual(transformer.stats['total_records'], 4)
+
+    def test_time_columns_are_cast_after_fallback(self):
+        path = self.write_csv('schedules.csv', (
+            "course_id,instructor_id,classroom_id,semester,year,day_of_week,start_time,end_time\n"
+            "1,1,1,Fall,2024,Monday,09:00:00,10:30\n"
+            "1,1,1,Fall,twenty,Tuesday,11:00,12:00:00\n"
+        ))
+        df = read_csv(path, 'schedule')
+
+        self.assertEqual(list(df['year']), ['2024', 'twenty'])
+        self.assertEqual(list(df['start_time']), [datetime.time(9), datetime.time(11)])
+        self.assertEqual(list(df['end_time']), [datetime.time(10, 30), datetime.time(12)])
+
+
+if __name__ == '__main__':
+    unittest.main()
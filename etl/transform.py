@@ -9,9 +9,12 @@ logger = setup_logger('Transform')
 class DataTransformer:
     """Transform and validate data"""
 
-    def __init__(self):
+    def __init__(self, rejects=None):
         self.validator = DataValidator()
-        self.errors = []
+        self.rejects = rejects
+        self.error_counts = {}
+        # Keys already kept per table, so chunked input is deduplicated across chunks
+        self.seen_keys = {}
         self.stats = {
             'total_records': 0,
             'valid_records': 0,
@@ -19,7 +22,7 @@ class DataTransformer:
             'duplicates_removed': 0
         }
 
-    def transform_students(self, df):
+    def transform_students(self, df, source=None):
         """Transform student data"""
         logger.info("Transforming student data")
         original_count = len(df)
@@ -29,7 +32,7 @@ class DataTransformer:
         df = df.copy()
 
         # Remove duplicates based on email
-        df = df.drop_duplicates(subset=['email'], keep='first')
+        df = self._drop_duplicates(df, 'student', ['email'])
         duplicates = original_count - len(df)
         self.stats['duplicates_removed'] += duplicates
         logger.info(f"Removed {duplicates} duplicate students")
@@ -65,13 +68,7 @@ class DataTransformer:
                 errors. append(f"Invalid status: {row.get('status')}")
 
             if errors:
-                self.errors. append({
-                    'table': 'student',
-                    'row': idx,
-                    'email': row.get('email'),
-                    'errors': errors
-                })
-                self.stats['invalid_records'] += 1
+                self._reject('student', idx, row, errors, source)
             else:
                 # Clean data
                 cleaned_row = {
@@ -91,7 +88,7 @@ class DataTransformer:
         logger.info(f"Transformed {len(result_df)} valid student records")
         return result_df
 
-    def transform_departments(self, df):
+    def transform_departments(self, df, source=None):
         """Transform department data"""
         logger. info("Transforming department data")
         original_count = len(df)
@@ -100,7 +97,7 @@ class DataTransformer:
         df = df.copy()
 
         # Remove duplicates based on dept_code
-        df = df. drop_duplicates(subset=['dept_code'], keep='first')
+        df = self._drop_duplicates(df, 'department', ['dept_code'])
         duplicates = original_count - len(df)
         self.stats['duplicates_removed'] += duplicates
 
@@ -114,13 +111,7 @@ class DataTransformer:
                     "Missing required fields: dept_name or dept_code")
 
             if errors:
-                self.errors. append({
-                    'table':  'department',
-                    'row': idx,
-                    'dept_code': row.get('dept_code'),
-                    'errors': errors
-                })
-                self.stats['invalid_records'] += 1
+                self._reject('department', idx, row, errors, source)
             else:
                 cleaned_row = {
                     'dept_name': self.validator. clean_string(row.get('dept_name'), 100),
@@ -135,14 +126,14 @@ class DataTransformer:
         logger.info(f"Transformed {len(result_df)} valid department records")
         return result_df
 
-    def transform_courses(self, df):
+    def transform_courses(self, df, source=None):
         """Transform course data"""
         logger. info("Transforming course data")
         original_count = len(df)
         self.stats['total_records'] += original_count
 
         df = df. copy()
-        df = df.drop_duplicates(subset=['course_code'], keep='first')
+        df = self._drop_duplicates(df, 'course', ['course_code'])
         duplicates = original_count - len(df)
         self.stats['duplicates_removed'] += duplicates
 
@@ -155,13 +146,7 @@ class DataTransformer:
                 errors.append(f"Invalid credits: {row. get('credits')}")
 
             if errors:
-                self.errors. append({
-                    'table':  'course',
-                    'row': idx,
-                    'course_code': row.get('course_code'),
-                    'errors': errors
-                })
-                self.stats['invalid_records'] += 1
+                self._reject('course', idx, row, errors, source)
             else:
                 cleaned_row = {
                     'course_code': self. validator.clean_string(row. get('course_code'), 20),
@@ -179,11 +164,168 @@ class DataTransformer:
         logger.info(f"Transformed {len(result_df)} valid course records")
         return result_df
 
+    def transform_schedules(self, df, source=None):
+        """Transform schedule data"""
+        logger.info("Transforming schedule data")
+        original_count = len(df)
+        self.stats['total_records'] += original_count
+
+        df = df.copy()
+
+        # A classroom can only hold one class per slot and term
+        df = self._drop_duplicates(
+            df, 'schedule', ['classroom_id', 'day_of_week', 'start_time', 'semester', 'year'])
+        duplicates = original_count - len(df)
+        self.stats['duplicates_removed'] += duplicates
+
+        days = ['Monday', 'Tuesday', 'Wednesday',
+                'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+        valid_rows = []
+        for idx, row in df.iterrows():
+            errors = []
+
+            for field in ['course_id', 'instructor_id', 'classroom_id']:
+                if not self.validator.validate_integer(row.get(field), min_val=1):
+                    errors.append(f"Invalid {field}: {row.get(field)}")
+
+            if not self.validator.validate_status(row.get('semester'), ['Fall', 'Spring', 'Summer']):
+                errors.append(f"Invalid semester: {row.get('semester')}")
+
+            if not self.validator.validate_integer(row.get('year'), min_val=2000, max_val=2100):
+                errors.append(f"Invalid year: {row.get('year')}")
+
+            if not self.validator.validate_status(row.get('day_of_week'), days):
+                errors.append(f"Invalid day_of_week: {row.get('day_of_week')}")
+
+            start_time = self.validator.parse_time(row.get('start_time'))
+            end_time = self.validator.parse_time(row.get('end_time'))
+            if start_time is None:
+                errors.append(f"Invalid start_time: {row.get('start_time')}")
+            if end_time is None:
+                errors.append(f"Invalid end_time: {row.get('end_time')}")
+            if start_time and end_time and end_time <= start_time:
+                errors.append(
+                    f"Invalid time range: {row.get('start_time')}-{row.get('end_time')}")
+
+            if errors:
+                self._reject('schedule', idx, row, errors, source)
+            else:
+                cleaned_row = {
+                    'course_id': int(row.get('course_id')),
+                    'instructor_id': int(row.get('instructor_id')),
+                    'classroom_id': int(row.get('classroom_id')),
+                    'semester': self.validator.clean_string(row.get('semester'), 20),
+                    'year': int(row.get('year')),
+                    'day_of_week': self.validator.clean_string(row.get('day_of_week'), 10),
+                    'start_time': start_time,
+                    'end_time': end_time
+                }
+                valid_rows.append(cleaned_row)
+                self.stats['valid_records'] += 1
+
+        result_df = pd.DataFrame(valid_rows)
+        logger.info(f"Transformed {len(result_df)} valid schedule records")
+        return result_df
+
+    def transform_enrollments(self, df, source=None):
+        """Transform enrollment data"""
+        logger.info("Transforming enrollment data")
+        original_count = len(df)
+        self.stats['total_records'] += original_count
+
+        df = df.copy()
+        df = self._drop_duplicates(df, 'enrollment', ['student_id', 'schedule_id'])
+        duplicates = original_count - len(df)
+        self.stats['duplicates_removed'] += duplicates
+
+        grades = ['A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D', 'F']
+
+        valid_rows = []
+        for idx, row in df.iterrows():
+            errors = []
+
+            for field in ['student_id', 'schedule_id']:
+                if not self.validator.validate_integer(row.get(field), min_val=1):
+                    errors.append(f"Invalid {field}: {row.get(field)}")
+
+            status = self.validator.clean_string(self._get(row, 'status')) or 'Enrolled'
+            if not self.validator.validate_status(status, ['Enrolled', 'Dropped', 'Completed']):
+                errors.append(f"Invalid status: {row.get('status')}")
+
+            grade = self.validator.clean_string(self._get(row, 'grade'), 2)
+            if grade and grade not in grades:
+                errors.append(f"Invalid grade: {row.get('grade')}")
+
+            # Mirrors the validate_grade trigger
+            if grade and status != 'Completed':
+                errors.append(f"Grade on non-completed enrollment: {grade}")
+            if status == 'Completed' and not grade:
+                errors.append("Missing grade: completed enrollment")
+
+            enrollment_date = self._get(row, 'enrollment_date')
+            if enrollment_date is not None and not self.validator.validate_date(enrollment_date):
+                errors.append(f"Invalid enrollment_date: {enrollment_date}")
+
+            if errors:
+                self._reject('enrollment', idx, row, errors, source)
+            else:
+                cleaned_row = {
+                    'student_id': int(row.get('student_id')),
+                    'schedule_id': int(row.get('schedule_id')),
+                    'enrollment_date': enrollment_date,
+                    'grade': grade,
+                    'status': status
+                }
+                valid_rows.append(cleaned_row)
+                self.stats['valid_records'] += 1
+
+        result_df = pd.DataFrame(valid_rows)
+        logger.info(f"Transformed {len(result_df)} valid enrollment records")
+        return result_df
+
+    @staticmethod
+    def _get(row, field):
+        """Row value with missing cells (NaN/None) returned as None"""
+        value = row.get(field)
+        return None if pd.isna(value) else value
+
+    def _drop_duplicates(self, df, table, subset):
+        """Keep the first row per key, including keys seen in earlier chunks of the table"""
+        df = df.drop_duplicates(subset=subset, keep='first')
+        seen = self.seen_keys.setdefault(table, set())
+        keys = list(df[subset].itertuples(index=False, name=None))
+        if seen:
+            new = [key not in seen for key in keys]
+            df = df[new]
+            keys = [key for key, keep in zip(keys, new) if keep]
+        seen.update(keys)
+        return df
+
+    def reject_malformed(self, table, df, source=None):
+        """Reject the rows the reader skipped for having the wrong number of fields"""
+        for entry in df.attrs.get('malformed_rows', []):
+            self.stats['total_records'] += 1
+            self._reject(table, None, pd.Series(entry['record'], dtype=object), entry['errors'], source)
+
+    def _reject(self, table, idx, row, errors, source=None):
+        """Stream a rejected row to the rejects sink and count its error types"""
+        table_counts = self.error_counts.setdefault(table, {})
+        for error in errors:
+            # "Invalid email: foo" -> "Invalid email"
+            error_type = error.split(':')[0]
+            table_counts[error_type] = table_counts.get(error_type, 0) + 1
+
+        if self.rejects:
+            self.rejects.write(table, idx, errors, row.to_dict(), source)
+        self.stats['invalid_records'] += 1
+
     def get_validation_report(self):
         """Generate validation report"""
         report = {
             'timestamp': datetime.now().isoformat(),
             'statistics': self.stats,
-            'errors': self.errors
+            'error_counts': self.error_counts,
+            'rejects_file': self.rejects.path if self.rejects and self.rejects.count else None
         }
         return report
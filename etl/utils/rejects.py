@@ -0,0 +1,69 @@
+import json
+import pandas as pd
+from datetime import date, datetime, time
+
+
+def _clean_value(value):
+    """Convert a cell value into something JSON can represent"""
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if hasattr(value, 'item'):
+        # numpy scalars (int64, float64, bool_)
+        return value.item()
+    return value
+
+
+def _json_default(value):
+    """Fallback serializer for dates, times and other non-JSON types"""
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    return str(value)
+
+
+class RejectsWriter:
+    """JSON Lines sink for the rows one run rejected during transformation"""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = None
+
+    def write(self, table, row, errors, record, source=None):
+        """Append one rejected row with its reasons"""
+        # Opened lazily so clean runs do not leave empty files behind; 'x' refuses
+        # to mix rows into a file another run already wrote
+        if self._file is None:
+            self._file = open(self.path, 'x', encoding='utf-8')
+
+        entry = {
+            'table': table,
+            'source': source,
+            'row': _clean_value(row),
+            'errors': errors,
+            'record': {k: _clean_value(v) for k, v in record.items()}
+        }
+        self._file.write(json.dumps(entry, default=_json_default) + '\n')
+        self.count += 1
+
+    def close(self):
+        """Flush and close the rejects file"""
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+def read_rejects(path):
+    """Read a (corrected) rejects file back as one DataFrame per table"""
+    records = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            records.setdefault(entry['table'], []).append(entry['record'])
+
+    return {table: pd.DataFrame(rows) for table, rows in records.items()}
@@ -28,6 +28,23 @@ class DataValidator:
         except (ValueError, TypeError):
             return False
 
+    @staticmethod
+    def parse_time(time_value):
+        """Parse time of day (HH:MM or HH:MM:SS); returns None if invalid"""
+        if hasattr(time_value, 'hour'):
+            return time_value
+        for time_format in ('%H:%M', '%H:%M:%S'):
+            try:
+                return datetime.strptime(str(time_value).strip(), time_format).time()
+            except (ValueError, TypeError):
+                continue
+        return None
+
+    @staticmethod
+    def validate_time(time_value):
+        """Validate time of day (HH:MM or HH:MM:SS)"""
+        return DataValidator.parse_time(time_value) is not None
+
     @staticmethod
     def validate_year(year):
         """Validate year (1900-current year + 1)"""
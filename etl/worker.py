@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+ETL Worker:  job queue CLI for running several ETL workers in parallel
+Author:  Ankit
+Date: 2026-10-19
+
+    python worker.py enqueue --source csv --path sample_data/
+    python worker.py status
+    python worker.py work
+"""
+
+import os
+import sys
+import time
+import argparse
+import psycopg2
+from config import Config
+from etl import ETLPipeline
+from jobs import JobQueue, Heartbeat, default_worker_id
+from utils.logger import setup_logger
+
+logger = setup_logger('ETL-Worker')
+
+
+def run_job(queue, job, worker_id):
+    """Run one claimed job through the pipeline, keeping its lease alive"""
+    job_id = job['job_id']
+
+    # A previous attempt may have finished the load but died before reporting it
+    if job['run_id'] and queue.run_status(job['run_id']) == 'completed':
+        queue.complete(job_id, worker_id)
+        return True
+
+    # Google Sheets jobs store the spreadsheet id in source_path
+    spreadsheet_id = paths = None
+    if job['source_type'] == 'google_sheets':
+        spreadsheet_id = job['source_path']
+    elif job['source_path']:
+        paths = job['source_path'].split(os.pathsep)
+
+    # The pipeline stops before its next commit once the lease is lost or has run out
+    heartbeat = Heartbeat(Config.DB_CONFIG, job_id, worker_id, queue.lease_seconds)
+    pipeline = ETLPipeline(
+        source_type=job['source_type'],
+        source_path=paths,
+        spreadsheet_id=spreadsheet_id,
+        explicit_table=job['explicit_table'],
+        resume_run_id=job['run_id'],
+        on_run_start=lambda run_id: queue.set_run_id(job_id, run_id),
+        lease=heartbeat
+    )
+
+    heartbeat.start()
+    try:
+        success = pipeline.run(tables=job['tables'])
+    finally:
+        heartbeat.stop()
+
+    if heartbeat.expired():
+        logger.error(f"Lost the lease on job {job_id}; stopped without reporting a result")
+        return False
+
+    if success:
+        queue.complete(job_id, worker_id)
+    else:
+        queue.fail(job_id, worker_id, pipeline.error or 'ETL pipeline failed')
+    return success
+
+
+def work(args):
+    worker_id = args.worker_id or default_worker_id()
+    conn = psycopg2.connect(**Config.DB_CONFIG)
+    queue = JobQueue(conn)
+    queue.ensure_tables()
+    logger.info(f"Worker {worker_id} started")
+
+    try:
+        while True:
+            job = queue.claim(worker_id)
+            if job is None:
+                if args.exit_when_empty:
+                    logger.info("Queue is empty, exiting")
+                    return True
+                time.sleep(args.poll_interval)
+                continue
+
+            run_job(queue, job, worker_id)
+            if args.once:
+                return True
+    except KeyboardInterrupt:
+        # The current job's lease expires and another worker picks it up
+        logger.info(f"Worker {worker_id} stopped")
+        return True
+    finally:
+        conn.close()
+
+
+def enqueue(args):
+    conn = psycopg2.connect(**Config.DB_CONFIG)
+    try:
+        queue = JobQueue(conn)
+        queue.ensure_tables()
+        source_path = args.spreadsheet_id if args.source == 'google_sheets' else args.path
+        job_id = queue.enqueue(args.source, source_path, tables=args.tables,
+                               explicit_table=args.table, max_attempts=args.max_attempts)
+        print(job_id)
+        return True
+    finally:
+        conn.close()
+
+
+def status(args):
+    conn = psycopg2.connect(**Config.DB_CONFIG)
+    try:
+        queue = JobQueue(conn)
+        queue.ensure_tables()
+
+        counts = queue.summary()
+        print("  ".join(f"{s}: {counts.get(s, 0)}" for s in ['queued', 'running', 'completed', 'failed']))
+        print()
+        print(f"{'JOB':>6}  {'STATUS':<10} {'TRY':<5} {'WORKER':<24} {'RUN':<26} SOURCE")
+        for job in queue.list_jobs(args.limit):
+            tries = f"{job['attempts']}/{job['max_attempts']}"
+            source = f"{job['source_type']}:{job['source_path'] or ''}"
+            if job['tables']:
+                source += f" [{', '.join(job['tables'])}]"
+            print(f"{job['job_id']:>6}  {job['status']:<10} {tries:<5} "
+                  f"{job['worker_id'] or '-':<24} {job['run_id'] or '-':<26} {source}")
+            if job['last_error'] and job['status'] != 'completed':
+                print(f"{'':>8}error: {job['last_error']}")
+        return True
+    finally:
+        conn.close()
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='ETL job queue and worker')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue_parser = commands.add_parser('enqueue', help='Add an ETL job to the queue')
+    enqueue_parser.add_argument('--source', required=True, choices=Config.SOURCE_TYPES,
+                                help='Data source type')
+    enqueue_parser.add_argument('--path', nargs='+',
+                                help='CSV/JSON/Excel file(s), directories or glob patterns')
+    enqueue_parser.add_argument('--spreadsheet-id', help='Google Sheets ID')
+    enqueue_parser.add_argument('--tables', nargs='+', help='Specific tables to process')
+    enqueue_parser.add_argument('--table', help='Explicit table name for single-table files')
+    enqueue_parser.add_argument('--max-attempts', type=int, help='Attempts before the job is failed')
+
+    status_parser = commands.add_parser('status', help='Show queue counts and recent jobs')
+    status_parser.add_argument('--limit', type=int, default=20, help='Number of jobs to list')
+
+    work_parser = commands.add_parser('work', help='Claim and run jobs until stopped')
+    work_parser.add_argument('--worker-id', help='Worker name (default: host:pid)')
+    work_parser.add_argument('--poll-interval', type=int, default=Config.JOB_POLL_INTERVAL,
+                             help='Seconds to wait when the queue is empty')
+    work_parser.add_argument('--once', action='store_true', help='Run a single job, then exit')
+    work_parser.add_argument('--exit-when-empty', action='store_true',
+                             help='Exit instead of polling when no job is available')
+
+    args = parser.parse_args()
+
+    if args.command == 'enqueue':
+        if args.source in ['csv', 'json', 'excel'] and not args.path:
+            parser.error(f"--path is required for {args.source} source")
+        if args.source == 'google_sheets' and not (args.spreadsheet_id or Config.SPREADSHEET_ID):
+            parser.error("--spreadsheet-id is required for google_sheets source")
+
+    handlers = {'enqueue': enqueue, 'status': status, 'work': work}
+    success = handlers[args.command](args)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,10 @@
 -- Author:  Ankit
 -- Date: 2025-12-17
 -- Description: Complex queries for university database
+--
+-- Enrollment is joined to schedule on year as well as schedule_id, so with
+-- yearly partitions (07_partitioning.sql) both sides are pruned. That year
+-- column only exists after CALL migrate_to_term_partitions().
 -- ============================================================================
 
 -- ============================================================================
@@ -68,6 +72,7 @@ FROM
     course c
     LEFT JOIN schedule sch ON c.course_id = sch.course_id
     LEFT JOIN enrollment e ON sch.schedule_id = e.schedule_id
+    AND e.year = sch.year
 GROUP BY
     c.course_id,
     c.course_code,
@@ -95,6 +100,7 @@ FROM
     LEFT JOIN schedule sch ON i.instructor_id = sch.instructor_id
     LEFT JOIN course c ON sch.course_id = c.course_id
     LEFT JOIN enrollment e ON sch.schedule_id = e.schedule_id
+    AND e.year = sch.year
 GROUP BY
     i.instructor_id,
     i.first_name,
@@ -130,6 +136,7 @@ FROM
     JOIN department d ON s.department_id = d.department_id
     JOIN enrollment e ON s.student_id = e.student_id
     JOIN schedule sch ON e.schedule_id = sch.schedule_id
+    AND sch.year = e.year
     JOIN course c ON sch.course_id = c.course_id
     JOIN instructor i ON sch.instructor_id = i.instructor_id
     JOIN classroom cl ON sch.classroom_id = cl.classroom_id
@@ -211,6 +218,7 @@ FROM
     JOIN department d ON s.department_id = d.department_id
     LEFT JOIN enrollment e ON s.student_id = e.student_id
     LEFT JOIN schedule sch ON e.schedule_id = sch.schedule_id
+    AND sch.year = e.year
     LEFT JOIN course c ON sch.course_id = c.course_id
 GROUP BY
     s.student_id,
@@ -240,6 +248,7 @@ FROM
     classroom cl
     LEFT JOIN schedule sch ON cl.classroom_id = sch.classroom_id
     LEFT JOIN enrollment e ON sch.schedule_id = e.schedule_id
+    AND e.year = sch.year
 GROUP BY
     cl.classroom_id,
     cl.building,
@@ -280,6 +289,7 @@ FROM
     LEFT JOIN course c ON d.department_id = c.department_id
     LEFT JOIN schedule sch ON c.course_id = sch.course_id
     LEFT JOIN enrollment e ON sch.schedule_id = e.schedule_id
+    AND e.year = sch.year
 GROUP BY
     d.department_id,
     d.dept_name,
@@ -302,6 +312,7 @@ SELECT
     ) as avg_students_for_day
 FROM schedule sch
     LEFT JOIN enrollment e ON sch.schedule_id = e.schedule_id
+    AND e.year = sch.year
 GROUP BY
     sch.day_of_week,
     sch.start_time,
@@ -394,6 +405,7 @@ FROM
     course c
     JOIN schedule sch ON c.course_id = sch.course_id
     LEFT JOIN enrollment e ON sch.schedule_id = e.schedule_id
+    AND e.year = sch.year
     AND e.status = 'Completed'
 GROUP BY
     c.course_id,
@@ -428,6 +440,7 @@ FROM
     LEFT JOIN enrollment e ON s.student_id = e.student_id
     AND e.status = 'Completed'
     LEFT JOIN schedule sch ON e.schedule_id = sch.schedule_id
+    AND sch.year = e.year
     LEFT JOIN course c ON sch.course_id = c.course_id
 GROUP BY
     s.student_id,
@@ -451,6 +464,7 @@ SELECT
     ) as moving_avg_3_semesters
 FROM schedule sch
     LEFT JOIN enrollment e ON sch.schedule_id = e.schedule_id
+    AND e.year = sch.year
 GROUP BY
     sch.year,
     sch.semester
@@ -542,6 +556,7 @@ FROM
     JOIN department d ON c.department_id = d.department_id
     JOIN schedule sch ON c.course_id = sch.course_id
     LEFT JOIN enrollment e ON sch.schedule_id = e.schedule_id
+    AND e.year = sch.year
 GROUP BY
     c.course_id,
     c.course_code,
@@ -579,6 +594,7 @@ FROM
     LEFT JOIN schedule sch ON i.instructor_id = sch.instructor_id
     LEFT JOIN course c ON sch.course_id = c.course_id
     LEFT JOIN enrollment e ON sch.schedule_id = e.schedule_id
+    AND e.year = sch.year
 GROUP BY
     i.instructor_id,
     i.first_name,
@@ -613,6 +629,7 @@ SELECT
 FROM
     schedule sch
     LEFT JOIN enrollment e ON sch.schedule_id = e.schedule_id
+    AND e.year = sch.year
     LEFT JOIN student s ON e.student_id = s.student_id
     LEFT JOIN course c ON sch.course_id = c.course_id
 GROUP BY
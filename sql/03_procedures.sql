@@ -8,6 +8,16 @@
 -- SECTION 1: ENROLLMENT MANAGEMENT FUNCTIONS
 -- ============================================================================
 
+-- Function 1.0: Whether enrollment has been migrated to yearly partitions
+-- (see 07_partitioning.sql); partitioned enrollment rows carry their schedule's year
+CREATE OR REPLACE FUNCTION enrollment_is_partitioned()
+RETURNS BOOLEAN AS $$
+    SELECT EXISTS (
+        SELECT 1 FROM pg_partitioned_table
+        WHERE partrelid = 'enrollment'::regclass
+    );
+$$ LANGUAGE sql STABLE;
+
 -- Function 1.1: Check if student can enroll in a course
 CREATE OR REPLACE FUNCTION can_enroll_in_course(
     p_student_id INTEGER,
@@ -89,6 +99,14 @@ DECLARE
     v_reason TEXT;
     v_new_enrollment_id INTEGER;
 BEGIN
+    -- Lock the schedule before counting seats, as bulk_enroll_students does;
+    -- concurrent enrollments into the same section then take turns instead
+    -- of both seeing the last free seat
+    PERFORM 1
+    FROM schedule sch
+    WHERE sch.schedule_id = p_schedule_id
+    FOR NO KEY UPDATE;
+
     -- Check eligibility
     SELECT ce.can_enroll, ce.reason 
     INTO v_can_enroll, v_reason
@@ -100,14 +118,145 @@ BEGIN
     END IF;
     
     -- Enroll student
-    INSERT INTO enrollment (student_id, schedule_id, enrollment_date, status)
-    VALUES (p_student_id, p_schedule_id, CURRENT_DATE, 'Enrolled')
-    RETURNING enrollment. enrollment_id INTO v_new_enrollment_id;
+    IF enrollment_is_partitioned() THEN
+        INSERT INTO enrollment (student_id, schedule_id, year, enrollment_date, status)
+        SELECT p_student_id, p_schedule_id, sch.year, CURRENT_DATE, 'Enrolled'
+        FROM schedule sch
+        WHERE sch.schedule_id = p_schedule_id
+        RETURNING enrollment.enrollment_id INTO v_new_enrollment_id;
+    ELSE
+        INSERT INTO enrollment (student_id, schedule_id, enrollment_date, status)
+        VALUES (p_student_id, p_schedule_id, CURRENT_DATE, 'Enrolled')
+        RETURNING enrollment. enrollment_id INTO v_new_enrollment_id;
+    END IF;
     
     RETURN QUERY SELECT TRUE, 'Successfully enrolled', v_new_enrollment_id;
 END;
 $$ LANGUAGE plpgsql;
 
+-- Function 1.4: Bulk enroll a batch of (student, schedule) requests set-wise
+-- Validates every request in one pass, locks the affected schedules in
+-- schedule_id order (so concurrent batches cannot deadlock) and inserts all
+-- accepted rows with a single INSERT. Requests are granted seats in array order.
+CREATE OR REPLACE FUNCTION bulk_enroll_students(
+    p_student_ids INTEGER[],
+    p_schedule_ids INTEGER[]
+) RETURNS TABLE(
+    request_no INTEGER,
+    student_id INTEGER,
+    schedule_id INTEGER,
+    success BOOLEAN,
+    message TEXT,
+    enrollment_id INTEGER
+) AS $$
+DECLARE
+    -- Partitioned enrollment rows carry their schedule's year
+    v_year_column TEXT := CASE WHEN enrollment_is_partitioned() THEN ', year' ELSE '' END;
+    v_year_value TEXT := CASE WHEN enrollment_is_partitioned() THEN ', d.year' ELSE '' END;
+BEGIN
+    IF cardinality(p_student_ids) IS DISTINCT FROM cardinality(p_schedule_ids) THEN
+        RAISE EXCEPTION 'p_student_ids and p_schedule_ids must have the same length';
+    END IF;
+
+    -- Lock schedules in a deterministic order; serializes seat counting per schedule
+    PERFORM 1
+    FROM schedule sch
+    WHERE sch.schedule_id = ANY(p_schedule_ids)
+    ORDER BY sch.schedule_id
+    FOR NO KEY UPDATE;
+
+    RETURN QUERY EXECUTE format($q$
+        WITH requests AS (
+            SELECT r.ord::INTEGER AS request_no, r.student_id, r.schedule_id
+            FROM unnest($1, $2) WITH ORDINALITY AS r(student_id, schedule_id, ord)
+        ),
+        checked AS (
+            SELECT
+                r.request_no,
+                r.student_id,
+                r.schedule_id,
+                sch.year,
+                c.max_capacity,
+                CASE
+                    WHEN sch.schedule_id IS NULL THEN 'Schedule not found'
+                    WHEN st.student_id IS NULL THEN 'Student not found'
+                    WHEN ROW_NUMBER() OVER (
+                        PARTITION BY r.student_id, r.schedule_id ORDER BY r.request_no
+                    ) > 1 THEN 'Duplicate request in batch'
+                    WHEN EXISTS (
+                        SELECT 1 FROM enrollment e
+                        WHERE e.student_id = r.student_id
+                        AND e.schedule_id = r.schedule_id
+                    ) THEN 'Already enrolled in this course'
+                    WHEN c.prerequisite_course_id IS NOT NULL AND NOT EXISTS (
+                        SELECT 1
+                        FROM enrollment e
+                        JOIN schedule psch ON e.schedule_id = psch.schedule_id
+                        WHERE e.student_id = r.student_id
+                        AND psch.course_id = c.prerequisite_course_id
+                        AND e.status = 'Completed'
+                        AND e.grade IN ('A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-')
+                    ) THEN 'Prerequisite not completed'
+                END AS reject_reason
+            FROM requests r
+            LEFT JOIN schedule sch ON r.schedule_id = sch.schedule_id
+            LEFT JOIN course c ON sch.course_id = c.course_id
+            LEFT JOIN student st ON r.student_id = st.student_id
+        ),
+        seats_taken AS (
+            SELECT e.schedule_id, COUNT(*) AS enrolled
+            FROM enrollment e
+            WHERE e.schedule_id IN (SELECT ch.schedule_id FROM checked ch WHERE ch.reject_reason IS NULL)
+            AND e.status = 'Enrolled'
+            GROUP BY e.schedule_id
+        ),
+        decided AS (
+            SELECT
+                ch.request_no,
+                ch.student_id,
+                ch.schedule_id,
+                ch.year,
+                CASE
+                    WHEN ch.reject_reason IS NOT NULL THEN ch.reject_reason
+                    WHEN COALESCE(st.enrolled, 0) + ROW_NUMBER() OVER (
+                        PARTITION BY ch.schedule_id, ch.reject_reason IS NULL ORDER BY ch.request_no
+                    ) > ch.max_capacity THEN 'Course is full'
+                    ELSE 'Successfully enrolled'
+                END AS message
+            FROM checked ch
+            LEFT JOIN seats_taken st ON ch.schedule_id = st.schedule_id
+        ),
+        inserted AS (
+            INSERT INTO enrollment (student_id, schedule_id%1$s, enrollment_date, status)
+            SELECT d.student_id, d.schedule_id%2$s, CURRENT_DATE, 'Enrolled'
+            FROM decided d
+            WHERE d.message = 'Successfully enrolled'
+            ORDER BY d.request_no
+            -- A concurrent single enrollment may have won the race
+            ON CONFLICT DO NOTHING
+            RETURNING enrollment.enrollment_id, enrollment.student_id, enrollment.schedule_id
+        )
+        SELECT
+            d.request_no,
+            d.student_id,
+            d.schedule_id,
+            i.enrollment_id IS NOT NULL,
+            CASE
+                WHEN d.message = 'Successfully enrolled' AND i.enrollment_id IS NULL
+                THEN 'Already enrolled in this course'
+                ELSE d.message
+            END,
+            i.enrollment_id
+        FROM decided d
+        LEFT JOIN inserted i ON d.message = 'Successfully enrolled'
+        AND i.student_id = d.student_id
+        AND i.schedule_id = d.schedule_id
+        ORDER BY d.request_no
+    $q$, v_year_column, v_year_value)
+    USING p_student_ids, p_schedule_ids;
+END;
+$$ LANGUAGE plpgsql;
+
 -- Function 1.3: Drop course
 CREATE OR REPLACE FUNCTION drop_course(
     p_enrollment_id INTEGER
@@ -484,7 +633,7 @@ BEGIN
         COALESCE(v_last, 0),
         v_trend,
         CASE 
-            WHEN v_trend = 'Increasing' THEN CEIL(v_avg / 30. 0) + 1
+            WHEN v_trend = 'Increasing' THEN CEIL(v_avg / 30.0) + 1
             WHEN v_trend = 'Decreasing' THEN GREATEST(CEIL(v_avg / 30.0) - 1, 1)
             ELSE CEIL(v_avg / 30.0)
         END::INTEGER
@@ -498,19 +647,33 @@ $$ LANGUAGE plpgsql;
 -- ============================================================================
 
 -- Trigger 1: Auto-update enrollment count
+-- Statement-level with a transition table: fires once per INSERT/UPDATE
+-- statement (e.g. one bulk_enroll_students call) instead of once per row
 CREATE OR REPLACE FUNCTION update_enrollment_count()
 RETURNS TRIGGER AS $$
+DECLARE
+    v_rows INTEGER;
 BEGIN
     -- This could update a summary table or send notifications
-    RAISE NOTICE 'Enrollment changed:  Student %, Schedule %, Status %', 
-        NEW.student_id, NEW. schedule_id, NEW.status;
-    RETURN NEW;
+    SELECT COUNT(*) INTO v_rows FROM changed_enrollments;
+    RAISE NOTICE 'Enrollment changed:  % rows (%)', v_rows, TG_OP;
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_enrollment_change
-AFTER INSERT OR UPDATE ON enrollment
-FOR EACH ROW
+DROP TRIGGER IF EXISTS trg_enrollment_change ON enrollment;
+
+-- Transition tables allow only one event per trigger
+CREATE TRIGGER trg_enrollment_insert
+AFTER INSERT ON enrollment
+REFERENCING NEW TABLE AS changed_enrollments
+FOR EACH STATEMENT
+EXECUTE FUNCTION update_enrollment_count();
+
+CREATE TRIGGER trg_enrollment_update
+AFTER UPDATE ON enrollment
+REFERENCING NEW TABLE AS changed_enrollments
+FOR EACH STATEMENT
 EXECUTE FUNCTION update_enrollment_count();
 
 -- Trigger 2: Validate grade before insert
@@ -574,6 +737,9 @@ SELECT * FROM can_enroll_in_course(1, 1);
 -- Example 2: Enroll student
 SELECT * FROM enroll_student(1, 1);
 
+-- Example 2b: Enroll a batch (request i = student_ids[i] into schedule_ids[i])
+SELECT * FROM bulk_enroll_students(ARRAY[1, 2, 3], ARRAY[5, 5, 7]);
+
 -- Example 3: Calculate student GPA
 SELECT * FROM calculate_student_gpa(1);
 
@@ -249,6 +249,19 @@ SELECT *
 FROM course_prerequisites
 ORDER BY level, course_code;
 
+-- Query 3.4: Same prerequisite information from the closure table
+-- (08_prerequisite_closure.sql); an index lookup instead of a recursive walk
+EXPLAIN
+ANALYZE
+SELECT c.course_code, c.course_name, anc.course_code AS prerequisite_code, cl.depth
+FROM
+    course_prerequisite_closure cl
+    JOIN course c ON cl.course_id = c.course_id
+    JOIN course anc ON cl.ancestor_course_id = anc.course_id
+WHERE
+    cl.course_id = 5
+ORDER BY cl.depth;
+
 -- ============================================================================
 -- SECTION 4: QUERY OPTIMIZATION TECHNIQUES
 -- ============================================================================
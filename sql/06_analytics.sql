@@ -2,6 +2,10 @@
 -- ADVANCED ANALYTICS QUERIES
 -- Author:  Ankit
 -- Date: 2025-12-17
+--
+-- Enrollment is joined to schedule on year as well as schedule_id, so with
+-- yearly partitions (07_partitioning.sql) both sides are pruned. That year
+-- column only exists after CALL migrate_to_term_partitions().
 -- ============================================================================
 
 -- ============================================================================
@@ -77,6 +81,7 @@ FROM
     schedule sch
     JOIN course c ON sch.course_id = c.course_id
     LEFT JOIN enrollment e ON sch.schedule_id = e.schedule_id
+    AND e.year = sch.year
 GROUP BY
     sch.year,
     sch.semester,
@@ -176,6 +181,7 @@ WITH
             course c
             JOIN schedule sch ON c.course_id = sch.course_id
             LEFT JOIN enrollment e ON sch.schedule_id = e.schedule_id
+            AND e.year = sch.year
         GROUP BY
             c.course_id,
             c.course_code,
@@ -310,6 +316,7 @@ FROM
     JOIN department d ON i.department_id = d.department_id
     LEFT JOIN schedule sch ON i.instructor_id = sch.instructor_id
     LEFT JOIN enrollment e ON sch.schedule_id = e.schedule_id
+    AND e.year = sch.year
 GROUP BY
     i.instructor_id,
     i.first_name,
@@ -326,8 +333,8 @@ ORDER BY avg_student_gpa DESC NULLS LAST;
 
 -- Query 4.1: Enrollment trends over time
 SELECT
-    year,
-    semester,
+    sch.year,
+    sch.semester,
     COUNT(DISTINCT s.student_id) as unique_students,
     COUNT(e.enrollment_id) as total_enrollments,
     ROUND(
@@ -338,19 +345,19 @@ SELECT
         2
     ) as avg_courses_per_student,
     LAG(COUNT(e.enrollment_id)) OVER (
-        ORDER BY year, semester
+        ORDER BY sch.year, sch.semester
     ) as previous_semester_enrollments,
     COUNT(e.enrollment_id) - LAG(COUNT(e.enrollment_id)) OVER (
-        ORDER BY year, semester
+        ORDER BY sch.year, sch.semester
     ) as enrollment_change,
     ROUND(
         (
             COUNT(e.enrollment_id) - LAG(COUNT(e.enrollment_id)) OVER (
-                ORDER BY year, semester
+                ORDER BY sch.year, sch.semester
             )
         )::NUMERIC / NULLIF(
             LAG(COUNT(e.enrollment_id)) OVER (
-                ORDER BY year, semester
+                ORDER BY sch.year, sch.semester
             ),
             0
         ) * 100,
@@ -359,10 +366,11 @@ SELECT
 FROM
     schedule sch
     LEFT JOIN enrollment e ON sch.schedule_id = e.schedule_id
+    AND e.year = sch.year
     LEFT JOIN student s ON e.student_id = s.student_id
 GROUP BY
-    year,
-    semester
+    sch.year,
+    sch.semester
 ORDER BY year DESC, semester;
 
 -- Query 4.2: Grade inflation/deflation analysis
@@ -419,6 +427,7 @@ SELECT
     ) as percent_f
 FROM schedule sch
     LEFT JOIN enrollment e ON sch.schedule_id = e.schedule_id
+    AND e.year = sch.year
 WHERE
     e.status = 'Completed'
 GROUP BY
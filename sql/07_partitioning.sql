@@ -0,0 +1,382 @@
+-- ============================================================================
+-- TERM PARTITIONING: SCHEDULE AND ENROLLMENT
+-- Author:  Ankit
+-- Date: 2026-10-19
+-- ============================================================================
+--
+-- Almost every report filters schedule/enrollment by semester and year, so as
+-- history grows every query scans every past term. This file converts both
+-- tables to declarative RANGE partitions on year (one partition per year):
+--
+--   schedule    PARTITION BY RANGE (year)  -> schedule_y2024, schedule_y2025, ...
+--   enrollment  PARTITION BY RANGE (year)  -> enrollment_y2024, ...
+--
+-- enrollment gets a `year` column (copied from its schedule) because the
+-- partition key must be part of every unique key and of the foreign key to
+-- schedule. Indexes are created on the parents, so every partition gets its
+-- own matching local index automatically.
+--
+-- Requires PostgreSQL 13+ (BEFORE row triggers on partitioned tables).
+--
+-- Run order:
+--   \i 03_procedures.sql          -- functions and trigger functions
+--   \i 07_partitioning.sql        -- helpers below
+--   CALL migrate_to_term_partitions();
+--   \i 02_views.sql               -- views are dropped with the old tables
+-- ============================================================================
+
+-- ============================================================================
+-- SECTION 1: PARTITION HELPERS
+-- ============================================================================
+
+-- Function 1.1: Create the schedule/enrollment partitions for a year (idempotent)
+CREATE OR REPLACE FUNCTION ensure_year_partitions(p_year INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF schedule FOR VALUES FROM (%s) TO (%s)',
+        'schedule_y' || p_year, p_year, p_year + 1
+    );
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF enrollment FOR VALUES FROM (%s) TO (%s)',
+        'enrollment_y' || p_year, p_year, p_year + 1
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function 1.2: List partitions with their bounds and sizes
+CREATE OR REPLACE FUNCTION list_term_partitions()
+RETURNS TABLE(
+    parent_table TEXT,
+    partition_name TEXT,
+    bounds TEXT,
+    row_estimate BIGINT,
+    total_size TEXT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        parent.relname::TEXT,
+        child.relname::TEXT,
+        pg_get_expr(child.relpartbound, child.oid),
+        child.reltuples::BIGINT,
+        pg_size_pretty(pg_total_relation_size(child.oid))
+    FROM pg_inherits inh
+    JOIN pg_class parent ON inh.inhparent = parent.oid
+    JOIN pg_class child ON inh.inhrelid = child.oid
+    WHERE parent.relname IN ('schedule', 'enrollment')
+    ORDER BY parent.relname, child.relname;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- SECTION 2: MIGRATION (heap tables -> partitioned tables)
+-- ============================================================================
+
+-- Procedure 2.1: One-time migration, runs as a single transaction
+CREATE OR REPLACE PROCEDURE migrate_to_term_partitions()
+AS $$
+DECLARE
+    v_year INTEGER;
+BEGIN
+    IF enrollment_is_partitioned() THEN
+        RAISE NOTICE 'schedule/enrollment are already partitioned';
+        RETURN;
+    END IF;
+
+    ALTER TABLE enrollment RENAME TO enrollment_legacy;
+    ALTER TABLE schedule RENAME TO schedule_legacy;
+
+    -- Same columns and checks as Task3/schema.sql; keys are added after the
+    -- legacy tables are gone so index names do not collide
+    CREATE TABLE schedule (
+        schedule_id INTEGER NOT NULL DEFAULT nextval('schedule_schedule_id_seq'),
+        course_id INTEGER NOT NULL,
+        instructor_id INTEGER NOT NULL,
+        classroom_id INTEGER NOT NULL,
+        semester VARCHAR(20) NOT NULL CHECK (
+            semester IN ('Fall', 'Spring', 'Summer')
+        ),
+        year INTEGER NOT NULL CHECK (
+            year >= 2000
+            AND year <= 2100
+        ),
+        day_of_week VARCHAR(10) NOT NULL CHECK (
+            day_of_week IN (
+                'Monday',
+                'Tuesday',
+                'Wednesday',
+                'Thursday',
+                'Friday',
+                'Saturday',
+                'Sunday'
+            )
+        ),
+        start_time TIME NOT NULL,
+        end_time TIME NOT NULL,
+        CHECK (end_time > start_time)
+    ) PARTITION BY RANGE (year);
+
+    CREATE TABLE enrollment (
+        enrollment_id INTEGER NOT NULL DEFAULT nextval('enrollment_enrollment_id_seq'),
+        student_id INTEGER NOT NULL,
+        schedule_id INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        enrollment_date DATE DEFAULT CURRENT_DATE,
+        grade VARCHAR(2) CHECK (
+            grade IN (
+                'A',
+                'A-',
+                'B+',
+                'B',
+                'B-',
+                'C+',
+                'C',
+                'C-',
+                'D',
+                'F'
+            )
+            OR grade IS NULL
+        ),
+        status VARCHAR(20) DEFAULT 'Enrolled' CHECK (
+            status IN (
+                'Enrolled',
+                'Dropped',
+                'Completed'
+            )
+        )
+    ) PARTITION BY RANGE (year);
+
+    -- One partition per year with data, plus the current year
+    FOR v_year IN
+        SELECT year FROM schedule_legacy
+        UNION
+        SELECT EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER
+    LOOP
+        PERFORM ensure_year_partitions(v_year);
+    END LOOP;
+
+    INSERT INTO schedule (
+        schedule_id, course_id, instructor_id, classroom_id,
+        semester, year, day_of_week, start_time, end_time
+    )
+    SELECT
+        schedule_id, course_id, instructor_id, classroom_id,
+        semester, year, day_of_week, start_time, end_time
+    FROM schedule_legacy;
+
+    INSERT INTO enrollment (
+        enrollment_id, student_id, schedule_id, year,
+        enrollment_date, grade, status
+    )
+    SELECT
+        e.enrollment_id, e.student_id, e.schedule_id, sch.year,
+        e.enrollment_date, e.grade, e.status
+    FROM enrollment_legacy e
+    JOIN schedule_legacy sch ON e.schedule_id = sch.schedule_id;
+
+    -- Keep the id sequences when the legacy tables are dropped
+    ALTER SEQUENCE schedule_schedule_id_seq OWNED BY schedule.schedule_id;
+    ALTER SEQUENCE enrollment_enrollment_id_seq OWNED BY enrollment.enrollment_id;
+
+    -- Also drops views over the old tables; re-run 02_views.sql afterwards
+    DROP TABLE enrollment_legacy CASCADE;
+    DROP TABLE schedule_legacy CASCADE;
+
+    -- Keys (the partition key is part of every unique key)
+    ALTER TABLE schedule
+        ADD PRIMARY KEY (schedule_id, year),
+        ADD UNIQUE (classroom_id, day_of_week, start_time, semester, year),
+        ADD FOREIGN KEY (course_id) REFERENCES course (course_id) ON DELETE CASCADE,
+        ADD FOREIGN KEY (instructor_id) REFERENCES instructor (instructor_id) ON DELETE RESTRICT,
+        ADD FOREIGN KEY (classroom_id) REFERENCES classroom (classroom_id) ON DELETE RESTRICT;
+
+    ALTER TABLE enrollment
+        ADD PRIMARY KEY (enrollment_id, year),
+        ADD UNIQUE (student_id, schedule_id, year),
+        ADD FOREIGN KEY (student_id) REFERENCES student (student_id) ON DELETE CASCADE,
+        ADD FOREIGN KEY (schedule_id, year) REFERENCES schedule (schedule_id, year) ON DELETE CASCADE;
+
+    -- Indexes on the parents cascade to a local index per partition
+    CREATE INDEX idx_schedule_course ON schedule (course_id);
+    CREATE INDEX idx_schedule_instructor ON schedule (instructor_id);
+    CREATE INDEX idx_schedule_classroom ON schedule (classroom_id);
+    CREATE INDEX idx_schedule_semester_year ON schedule (semester, year);
+    CREATE INDEX idx_schedule_day_time ON schedule (day_of_week, start_time);
+
+    CREATE INDEX idx_enrollment_student ON enrollment (student_id);
+    CREATE INDEX idx_enrollment_schedule ON enrollment (schedule_id);
+    CREATE INDEX idx_enrollment_status ON enrollment (status);
+    CREATE INDEX idx_enrolled_courses ON enrollment (student_id, schedule_id)
+    WHERE
+        status = 'Enrolled';
+    CREATE INDEX idx_completed_enrollments ON enrollment (student_id, grade)
+    WHERE
+        status = 'Completed';
+
+    -- Triggers from 03_procedures.sql (cloned onto every partition)
+    CREATE TRIGGER trg_enrollment_insert
+    AFTER INSERT ON enrollment
+    REFERENCING NEW TABLE AS changed_enrollments
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION update_enrollment_count();
+
+    CREATE TRIGGER trg_enrollment_update
+    AFTER UPDATE ON enrollment
+    REFERENCING NEW TABLE AS changed_enrollments
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION update_enrollment_count();
+
+    CREATE TRIGGER trg_validate_grade
+    BEFORE INSERT OR UPDATE ON enrollment
+    FOR EACH ROW
+    EXECUTE FUNCTION validate_grade();
+
+    CREATE TRIGGER trg_prevent_schedule_conflicts
+    BEFORE INSERT OR UPDATE ON schedule
+    FOR EACH ROW
+    EXECUTE FUNCTION prevent_schedule_conflicts();
+
+    COMMENT ON TABLE schedule IS 'Course schedules with time, location, and instructor (partitioned by year)';
+    COMMENT ON TABLE enrollment IS 'Student enrollments in scheduled courses (partitioned by year)';
+
+    RAISE NOTICE 'schedule/enrollment migrated to yearly partitions; re-run 02_views.sql';
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- SECTION 3: ARCHIVING OLD TERMS (detach / attach)
+-- ============================================================================
+-- Detaching is a catalog-only change: no rows are copied. The detached
+-- tables move to the "archive" schema and keep their own foreign key, so
+-- they remain queryable (archive.schedule_y2019 etc.) but no longer cost
+-- anything for queries on the live tables.
+
+-- Procedure 3.1: Archive a year
+CREATE OR REPLACE PROCEDURE archive_year_partitions(p_year INTEGER)
+AS $$
+DECLARE
+    v_schedule TEXT := 'schedule_y' || p_year;
+    v_enrollment TEXT := 'enrollment_y' || p_year;
+    v_constraint TEXT;
+BEGIN
+    CREATE SCHEMA IF NOT EXISTS archive;
+
+    -- Referencing side first, otherwise the schedule detach is blocked
+    EXECUTE format('ALTER TABLE enrollment DETACH PARTITION %I', v_enrollment);
+
+    -- The detached table keeps a copy of the FK to the live schedule table
+    FOR v_constraint IN
+        SELECT conname
+        FROM pg_constraint
+        WHERE conrelid = format('%I', v_enrollment)::regclass
+        AND contype = 'f'
+        AND confrelid = 'schedule'::regclass
+    LOOP
+        EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', v_enrollment, v_constraint);
+    END LOOP;
+
+    EXECUTE format('ALTER TABLE schedule DETACH PARTITION %I', v_schedule);
+
+    EXECUTE format('ALTER TABLE %I SET SCHEMA archive', v_schedule);
+    EXECUTE format('ALTER TABLE %I SET SCHEMA archive', v_enrollment);
+    EXECUTE format(
+        'ALTER TABLE archive.%I ADD CONSTRAINT %I FOREIGN KEY (schedule_id, year) REFERENCES archive.%I (schedule_id, year)',
+        v_enrollment, v_enrollment || '_schedule_fkey', v_schedule
+    );
+
+    RAISE NOTICE 'Archived % and % to schema archive', v_schedule, v_enrollment;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Procedure 3.2: Bring an archived year back
+CREATE OR REPLACE PROCEDURE restore_year_partitions(p_year INTEGER)
+AS $$
+DECLARE
+    v_schedule TEXT := 'schedule_y' || p_year;
+    v_enrollment TEXT := 'enrollment_y' || p_year;
+    v_bound TEXT := format('year >= %s AND year < %s', p_year, p_year + 1);
+BEGIN
+    EXECUTE format(
+        'ALTER TABLE archive.%I DROP CONSTRAINT IF EXISTS %I',
+        v_enrollment, v_enrollment || '_schedule_fkey'
+    );
+    EXECUTE format('ALTER TABLE archive.%I SET SCHEMA public', v_schedule);
+    EXECUTE format('ALTER TABLE archive.%I SET SCHEMA public', v_enrollment);
+
+    -- A matching CHECK lets ATTACH skip the validation scan
+    EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I CHECK (%s)', v_schedule, v_schedule || '_bound', v_bound);
+    EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I CHECK (%s)', v_enrollment, v_enrollment || '_bound', v_bound);
+
+    EXECUTE format(
+        'ALTER TABLE schedule ATTACH PARTITION %I FOR VALUES FROM (%s) TO (%s)',
+        v_schedule, p_year, p_year + 1
+    );
+    EXECUTE format(
+        'ALTER TABLE enrollment ATTACH PARTITION %I FOR VALUES FROM (%s) TO (%s)',
+        v_enrollment, p_year, p_year + 1
+    );
+
+    EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', v_schedule, v_schedule || '_bound');
+    EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', v_enrollment, v_enrollment || '_bound');
+
+    RAISE NOTICE 'Restored % and %', v_schedule, v_enrollment;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- SECTION 4: PARTITION PRUNING
+-- ============================================================================
+
+-- Run these after CALL migrate_to_term_partitions(); before it, enrollment
+-- has no year column
+/*
+-- Query 4.1: Current-term schedule only touches this year's partition
+EXPLAIN
+SELECT
+    sch.schedule_id,
+    sch.course_id,
+    sch.day_of_week,
+    sch.start_time
+FROM schedule sch
+WHERE
+    sch.semester = 'Fall'
+    AND sch.year = 2024;
+
+-- Query 4.2: Filter enrollment on year as well so it is pruned too
+EXPLAIN
+SELECT
+    c.course_code,
+    COUNT(e.enrollment_id) as enrolled
+FROM
+    schedule sch
+    JOIN course c ON sch.course_id = c.course_id
+    LEFT JOIN enrollment e ON e.schedule_id = sch.schedule_id
+    AND e.year = 2024
+    AND e.status = 'Enrolled'
+WHERE
+    sch.semester = 'Fall'
+    AND sch.year = 2024
+GROUP BY
+    c.course_code;
+*/
+
+-- ============================================================================
+-- USAGE EXAMPLES
+-- ============================================================================
+
+/*
+-- Example 1: Migrate (once), then recreate views
+CALL migrate_to_term_partitions();
+\i 02_views.sql
+
+-- Example 2: Create next year's partitions ahead of registration
+SELECT ensure_year_partitions(2026);
+
+-- Example 3: Inspect partitions
+SELECT * FROM list_term_partitions();
+
+-- Example 4: Archive / restore a year
+CALL archive_year_partitions(2019);
+CALL restore_year_partitions(2019);
+*/
@@ -0,0 +1,238 @@
+-- ============================================================================
+-- PREREQUISITE TRANSITIVE CLOSURE
+-- Author:  Ankit
+-- Date: 2026-10-19
+-- ============================================================================
+--
+-- Prerequisite chains used to be walked with recursive CTEs at query time
+-- (01_queries.sql Query 2.2, 04_optimization.sql Query 3.3). This file keeps
+-- a closure table with one row per (course, ancestor) pair:
+--
+--   course_id | ancestor_course_id | depth
+--   CS301     | CS201              | 1      (direct prerequisite)
+--   CS301     | CS101              | 2      (prerequisite of the prerequisite)
+--
+-- so "all prerequisites of X" and "is Y required for X" are single index
+-- lookups. Triggers on course keep it current for every insert/update of
+-- prerequisite_course_id (including ETL loads) and reject prerequisite cycles.
+-- ============================================================================
+
+-- ============================================================================
+-- SECTION 1: CLOSURE TABLE
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS course_prerequisite_closure (
+    course_id INTEGER NOT NULL,
+    ancestor_course_id INTEGER NOT NULL,
+    depth INTEGER NOT NULL CHECK (depth > 0),
+    PRIMARY KEY (course_id, ancestor_course_id),
+    FOREIGN KEY (course_id) REFERENCES course (course_id) ON DELETE CASCADE,
+    FOREIGN KEY (ancestor_course_id) REFERENCES course (course_id) ON DELETE CASCADE
+);
+
+-- Reverse lookups: "which courses require X"
+CREATE INDEX IF NOT EXISTS idx_prereq_closure_ancestor ON course_prerequisite_closure (ancestor_course_id, course_id);
+
+COMMENT ON TABLE course_prerequisite_closure IS 'Transitive closure of course.prerequisite_course_id (maintained by triggers)';
+
+-- ============================================================================
+-- SECTION 2: MAINTENANCE FUNCTIONS
+-- ============================================================================
+
+-- Function 2.1: Recompute closure rows after one course's prerequisite changed
+-- Only the course and the courses that (transitively) require it are touched.
+CREATE OR REPLACE FUNCTION refresh_prerequisite_closure(p_course_id INTEGER)
+RETURNS VOID AS $$
+DECLARE
+    v_parent INTEGER;
+BEGIN
+    SELECT prerequisite_course_id INTO v_parent
+    FROM course
+    WHERE course_id = p_course_id;
+
+    -- A cycle means the new prerequisite is the course itself or requires it
+    IF v_parent = p_course_id OR EXISTS (
+        SELECT 1 FROM course_prerequisite_closure
+        WHERE course_id = v_parent
+        AND ancestor_course_id = p_course_id
+    ) THEN
+        RAISE EXCEPTION 'Prerequisite cycle: course % cannot require course %', p_course_id, v_parent;
+    END IF;
+
+    -- Unlink the subtree (course + dependents) from its old ancestors
+    DELETE FROM course_prerequisite_closure cl
+    WHERE (
+        cl.course_id = p_course_id
+        OR cl.course_id IN (
+            SELECT d.course_id FROM course_prerequisite_closure d
+            WHERE d.ancestor_course_id = p_course_id
+        )
+    )
+    AND cl.ancestor_course_id <> p_course_id
+    AND cl.ancestor_course_id NOT IN (
+        SELECT d.course_id FROM course_prerequisite_closure d
+        WHERE d.ancestor_course_id = p_course_id
+    );
+
+    IF v_parent IS NULL THEN
+        RETURN;
+    END IF;
+
+    -- Link every subtree member to the new prerequisite and its ancestors
+    INSERT INTO course_prerequisite_closure (course_id, ancestor_course_id, depth)
+    SELECT sub.course_id, anc.ancestor_course_id, sub.depth + anc.depth
+    FROM (
+        SELECT p_course_id AS course_id, 0 AS depth
+        UNION ALL
+        SELECT d.course_id, d.depth
+        FROM course_prerequisite_closure d
+        WHERE d.ancestor_course_id = p_course_id
+    ) sub
+    CROSS JOIN (
+        SELECT v_parent AS ancestor_course_id, 1 AS depth
+        UNION ALL
+        SELECT a.ancestor_course_id, a.depth + 1
+        FROM course_prerequisite_closure a
+        WHERE a.course_id = v_parent
+    ) anc;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function 2.2: Rebuild the whole closure from course (initial load / repair)
+CREATE OR REPLACE FUNCTION rebuild_prerequisite_closure()
+RETURNS INTEGER AS $$
+DECLARE
+    v_cycle_courses INTEGER[];
+    v_rows INTEGER;
+BEGIN
+    -- Walk every chain; the path array stops the walk at a repeated course
+    WITH RECURSIVE chain AS (
+        SELECT course_id, prerequisite_course_id AS ancestor_course_id, ARRAY[course_id] AS path
+        FROM course
+        WHERE prerequisite_course_id IS NOT NULL
+        UNION ALL
+        SELECT ch.course_id, c.prerequisite_course_id, ch.path || ch.ancestor_course_id
+        FROM chain ch
+        JOIN course c ON c.course_id = ch.ancestor_course_id
+        WHERE c.prerequisite_course_id IS NOT NULL
+        AND NOT ch.ancestor_course_id = ANY(ch.path)
+    )
+    SELECT array_agg(DISTINCT course_id) INTO v_cycle_courses
+    FROM chain
+    WHERE ancestor_course_id = ANY(path);
+
+    IF v_cycle_courses IS NOT NULL THEN
+        RAISE EXCEPTION 'Prerequisite cycle involving courses %', v_cycle_courses;
+    END IF;
+
+    TRUNCATE course_prerequisite_closure;
+
+    INSERT INTO course_prerequisite_closure (course_id, ancestor_course_id, depth)
+    WITH RECURSIVE chain AS (
+        SELECT course_id, prerequisite_course_id AS ancestor_course_id, 1 AS depth
+        FROM course
+        WHERE prerequisite_course_id IS NOT NULL
+        UNION ALL
+        SELECT ch.course_id, c.prerequisite_course_id, ch.depth + 1
+        FROM chain ch
+        JOIN course c ON c.course_id = ch.ancestor_course_id
+        WHERE c.prerequisite_course_id IS NOT NULL
+    )
+    SELECT course_id, ancestor_course_id, depth
+    FROM chain;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- SECTION 3: TRIGGERS
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION maintain_prerequisite_closure()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_prerequisite_closure(NEW.course_id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_prerequisite_closure_insert ON course;
+
+CREATE TRIGGER trg_prerequisite_closure_insert
+AFTER INSERT ON course
+FOR EACH ROW
+WHEN (NEW.prerequisite_course_id IS NOT NULL)
+EXECUTE FUNCTION maintain_prerequisite_closure();
+
+-- ETL upserts SET prerequisite_course_id on every row; only real changes fire
+DROP TRIGGER IF EXISTS trg_prerequisite_closure_update ON course;
+
+CREATE TRIGGER trg_prerequisite_closure_update
+AFTER UPDATE OF prerequisite_course_id ON course
+FOR EACH ROW
+WHEN (OLD.prerequisite_course_id IS DISTINCT FROM NEW.prerequisite_course_id)
+EXECUTE FUNCTION maintain_prerequisite_closure();
+
+-- ============================================================================
+-- SECTION 4: LOOKUP FUNCTIONS
+-- ============================================================================
+
+-- Function 4.1: All prerequisites of a course, nearest first
+CREATE OR REPLACE FUNCTION get_course_prerequisites(p_course_id INTEGER)
+RETURNS TABLE(
+    course_id INTEGER,
+    course_code VARCHAR(20),
+    course_name VARCHAR(100),
+    depth INTEGER
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT c.course_id, c.course_code, c.course_name, cl.depth
+    FROM course_prerequisite_closure cl
+    JOIN course c ON cl.ancestor_course_id = c.course_id
+    WHERE cl.course_id = p_course_id
+    ORDER BY cl.depth;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Function 4.2: Is p_prerequisite_id required (directly or transitively) for p_course_id?
+CREATE OR REPLACE FUNCTION is_prerequisite_of(
+    p_prerequisite_id INTEGER,
+    p_course_id INTEGER
+) RETURNS BOOLEAN AS $$
+    SELECT EXISTS (
+        SELECT 1 FROM course_prerequisite_closure
+        WHERE course_id = p_course_id
+        AND ancestor_course_id = p_prerequisite_id
+    );
+$$ LANGUAGE sql STABLE;
+
+-- ============================================================================
+-- SECTION 5: INITIAL BUILD
+-- ============================================================================
+
+SELECT rebuild_prerequisite_closure();
+
+-- ============================================================================
+-- USAGE EXAMPLES
+-- ============================================================================
+
+/*
+-- Example 1: Full prerequisite chain of a course
+SELECT * FROM get_course_prerequisites(5);
+
+-- Example 2: Is course 1 required (at any depth) for course 5?
+SELECT is_prerequisite_of(1, 5);
+
+-- Example 3: Every course that depends on course 1
+SELECT c.course_code, cl.depth
+FROM course_prerequisite_closure cl
+JOIN course c ON cl.course_id = c.course_id
+WHERE cl.ancestor_course_id = 1
+ORDER BY cl.depth, c.course_code;
+
+-- Example 4: Repair after bulk changes made with triggers disabled
+SELECT rebuild_prerequisite_closure();
+*/
@@ -0,0 +1,296 @@
+-- ============================================================================
+-- CLASSROOM OCCUPANCY INDEX
+-- Author:  Ankit
+-- Date: 2026-10-19
+-- ============================================================================
+--
+-- find_available_classrooms used to anti-join the whole schedule table with
+-- OVERLAPS predicates for every call. This file keeps one occupancy row per
+-- scheduled class, with its weekly time slot stored as a tsrange on a fixed
+-- reference week (2001-01-01 was a Monday):
+--
+--   Monday    09:00-10:30  ->  ['2001-01-01 09:00', '2001-01-01 10:30')
+--   Wednesday 14:00-15:30  ->  ['2001-01-03 14:00', '2001-01-03 15:30')
+--
+-- A GiST exclusion constraint on (classroom_id, year, semester, slot) both
+-- forbids double booking and serves "is this room free" probes as index
+-- lookups. A trigger on schedule keeps the table in sync (ETL loads included);
+-- the ETL only rebuilds the terms it loaded when that trigger is missing.
+--
+-- Run after 03_procedures.sql (and again after migrate_to_term_partitions(),
+-- which recreates the schedule table and therefore drops its triggers).
+-- ============================================================================
+
+-- GiST support for plain equality columns in the exclusion constraint
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+-- ============================================================================
+-- SECTION 1: OCCUPANCY TABLE
+-- ============================================================================
+
+-- Function 1.1: Map a weekday + time range onto the reference week
+-- Day names are matched case-insensitively; anything else raises instead of
+-- yielding tsrange(NULL, NULL), which is unbounded and overlaps every booking
+CREATE OR REPLACE FUNCTION week_slot(
+    p_day_of_week VARCHAR(10),
+    p_start_time TIME,
+    p_end_time TIME
+) RETURNS TSRANGE AS $$
+DECLARE
+    v_day_offset INTEGER := array_position(
+        ARRAY['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
+        initcap(btrim(p_day_of_week))
+    ) - 1;
+BEGIN
+    IF v_day_offset IS NULL THEN
+        RAISE EXCEPTION 'Unknown day of week: %', p_day_of_week;
+    END IF;
+    IF p_start_time IS NULL OR p_end_time IS NULL THEN
+        RAISE EXCEPTION 'Start and end time are required (got % - %)', p_start_time, p_end_time;
+    END IF;
+
+    RETURN tsrange(
+        DATE '2001-01-01' + v_day_offset + p_start_time,
+        DATE '2001-01-01' + v_day_offset + p_end_time
+    );
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+CREATE TABLE IF NOT EXISTS classroom_occupancy (
+    schedule_id INTEGER PRIMARY KEY,
+    classroom_id INTEGER NOT NULL,
+    semester VARCHAR(20) NOT NULL,
+    year INTEGER NOT NULL,
+    slot TSRANGE NOT NULL,
+    FOREIGN KEY (classroom_id) REFERENCES classroom (classroom_id) ON DELETE CASCADE,
+    CONSTRAINT excl_classroom_occupancy EXCLUDE USING gist (
+        classroom_id WITH =,
+        year WITH =,
+        semester WITH =,
+        slot WITH &&
+    )
+);
+
+CREATE INDEX IF NOT EXISTS idx_classroom_capacity ON classroom (capacity);
+
+COMMENT ON TABLE classroom_occupancy IS 'Weekly time slots booked per classroom and term (maintained from schedule)';
+
+-- ============================================================================
+-- SECTION 2: SYNCHRONIZATION
+-- ============================================================================
+
+-- Function 2.1: Rebuild occupancy for one term, or everything when called without arguments
+CREATE OR REPLACE FUNCTION rebuild_classroom_occupancy(
+    p_semester VARCHAR(20) DEFAULT NULL,
+    p_year INTEGER DEFAULT NULL
+) RETURNS INTEGER AS $$
+DECLARE
+    v_rows INTEGER;
+BEGIN
+    DELETE FROM classroom_occupancy o
+    WHERE (p_semester IS NULL OR o.semester = p_semester)
+    AND (p_year IS NULL OR o.year = p_year);
+
+    INSERT INTO classroom_occupancy (schedule_id, classroom_id, semester, year, slot)
+    SELECT
+        sch.schedule_id,
+        sch.classroom_id,
+        sch.semester,
+        sch.year,
+        week_slot(sch.day_of_week, sch.start_time, sch.end_time)
+    FROM schedule sch
+    WHERE (p_semester IS NULL OR sch.semester = p_semester)
+    AND (p_year IS NULL OR sch.year = p_year);
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger: mirror every schedule change into classroom_occupancy
+CREATE OR REPLACE FUNCTION sync_classroom_occupancy()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM classroom_occupancy
+        WHERE schedule_id = OLD.schedule_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO classroom_occupancy (schedule_id, classroom_id, semester, year, slot)
+        VALUES (
+            NEW.schedule_id,
+            NEW.classroom_id,
+            NEW.semester,
+            NEW.year,
+            week_slot(NEW.day_of_week, NEW.start_time, NEW.end_time)
+        );
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_sync_classroom_occupancy ON schedule;
+
+CREATE TRIGGER trg_sync_classroom_occupancy
+AFTER INSERT OR UPDATE OR DELETE ON schedule
+FOR EACH ROW
+EXECUTE FUNCTION sync_classroom_occupancy();
+
+-- ============================================================================
+-- SECTION 3: AVAILABILITY SEARCH
+-- ============================================================================
+
+-- Function 3.1: Free classrooms for each of N requested slots in one call
+-- p_slots: [{"day_of_week": "Monday", "start_time": "09:00", "end_time": "10:30",
+--            "semester": "Spring", "year": 2024}, ...]
+CREATE OR REPLACE FUNCTION find_available_classrooms_batch(
+    p_slots JSONB,
+    p_min_capacity INTEGER DEFAULT 20
+) RETURNS TABLE(
+    slot_no INTEGER,
+    classroom_id INTEGER,
+    building VARCHAR(50),
+    room_number VARCHAR(10),
+    capacity INTEGER,
+    equipment TEXT
+) AS $$
+BEGIN
+    RETURN QUERY
+    WITH requested AS (
+        SELECT
+            r.ord::INTEGER AS request_no,
+            r.slot->>'semester' AS semester,
+            (r.slot->>'year')::INTEGER AS year,
+            week_slot(
+                r.slot->>'day_of_week',
+                (r.slot->>'start_time')::TIME,
+                (r.slot->>'end_time')::TIME
+            ) AS slot
+        FROM jsonb_array_elements(p_slots) WITH ORDINALITY AS r(slot, ord)
+    )
+    SELECT
+        req.request_no,
+        cl.classroom_id,
+        cl.building,
+        cl.room_number,
+        cl.capacity,
+        cl.equipment
+    FROM requested req
+    JOIN classroom cl ON cl.capacity >= p_min_capacity
+    WHERE NOT EXISTS (
+        SELECT 1
+        FROM classroom_occupancy o
+        WHERE o.classroom_id = cl.classroom_id
+        AND o.year = req.year
+        AND o.semester = req.semester
+        AND o.slot && req.slot
+    )
+    ORDER BY req.request_no, cl.capacity, cl.building, cl.room_number;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Function 3.2: Classrooms free in ALL requested slots (e.g. a Mon/Wed/Fri class)
+CREATE OR REPLACE FUNCTION find_classrooms_free_for_all_slots(
+    p_slots JSONB,
+    p_min_capacity INTEGER DEFAULT 20
+) RETURNS TABLE(
+    classroom_id INTEGER,
+    building VARCHAR(50),
+    room_number VARCHAR(10),
+    capacity INTEGER,
+    equipment TEXT
+) AS $$
+BEGIN
+    RETURN QUERY
+    WITH requested AS (
+        SELECT
+            r.slot->>'semester' AS semester,
+            (r.slot->>'year')::INTEGER AS year,
+            week_slot(
+                r.slot->>'day_of_week',
+                (r.slot->>'start_time')::TIME,
+                (r.slot->>'end_time')::TIME
+            ) AS slot
+        FROM jsonb_array_elements(p_slots) AS r(slot)
+    )
+    SELECT
+        cl.classroom_id,
+        cl.building,
+        cl.room_number,
+        cl.capacity,
+        cl.equipment
+    FROM classroom cl
+    WHERE cl.capacity >= p_min_capacity
+    AND NOT EXISTS (
+        SELECT 1
+        FROM requested req
+        JOIN classroom_occupancy o ON o.classroom_id = cl.classroom_id
+        AND o.year = req.year
+        AND o.semester = req.semester
+        AND o.slot && req.slot
+    )
+    ORDER BY cl.capacity, cl.building, cl.room_number;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Function 3.3: find_available_classrooms (03_procedures.sql, Function 4.1)
+-- now answered from the occupancy index; same signature and results
+CREATE OR REPLACE FUNCTION find_available_classrooms(
+    p_day_of_week VARCHAR(10),
+    p_start_time TIME,
+    p_end_time TIME,
+    p_semester VARCHAR(20),
+    p_year INTEGER,
+    p_min_capacity INTEGER DEFAULT 20
+) RETURNS TABLE(
+    classroom_id INTEGER,
+    building VARCHAR(50),
+    room_number VARCHAR(10),
+    capacity INTEGER,
+    equipment TEXT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT f.classroom_id, f.building, f.room_number, f.capacity, f.equipment
+    FROM find_available_classrooms_batch(
+        jsonb_build_array(jsonb_build_object(
+            'day_of_week', p_day_of_week,
+            'start_time', p_start_time,
+            'end_time', p_end_time,
+            'semester', p_semester,
+            'year', p_year
+        )),
+        p_min_capacity
+    ) f;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- ============================================================================
+-- SECTION 4: INITIAL BUILD
+-- ============================================================================
+
+SELECT rebuild_classroom_occupancy();
+
+-- ============================================================================
+-- USAGE EXAMPLES
+-- ============================================================================
+
+/*
+-- Example 1: Free rooms (capacity >= 30) for three candidate slots at once
+SELECT * FROM find_available_classrooms_batch('[
+    {"day_of_week": "Monday", "start_time": "09:00", "end_time": "10:30", "semester": "Spring", "year": 2024},
+    {"day_of_week": "Monday", "start_time": "14:00", "end_time": "15:30", "semester": "Spring", "year": 2024},
+    {"day_of_week": "Tuesday", "start_time": "09:00", "end_time": "10:30", "semester": "Spring", "year": 2024}
+]', 30);
+
+-- Example 2: Rooms free for every meeting of a Mon/Wed class
+SELECT * FROM find_classrooms_free_for_all_slots('[
+    {"day_of_week": "Monday", "start_time": "11:00", "end_time": "12:00", "semester": "Fall", "year": 2024},
+    {"day_of_week": "Wednesday", "start_time": "11:00", "end_time": "12:00", "semester": "Fall", "year": 2024}
+]', 40);
+
+-- Example 3: Resync one term after bulk changes
+SELECT rebuild_classroom_occupancy('Fall', 2024);
+*/